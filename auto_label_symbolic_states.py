@@ -0,0 +1,178 @@
+"""
+Offline symbolic state labeling of the LIBERO demonstrations.
+
+Replays the flattened MuJoCo states of every demonstration of a task suite in a pool of headless environments, runs the
+suite's detectors on each state and writes the per-timestep predicate vectors back into the demonstration files:
+
+    data/demo_i/symbolic_states/<detector>   int8 (num_states, num_symbols), 1 for True, 0 for False and -1 for not applicable
+    symbols/<detector>                       the grounded predicate names aligned to the columns above
+
+Example usage:
+
+    python auto_label_symbolic_states.py --benchmark libero_10 --num-workers 16
+"""
+import argparse
+import contextlib
+import multiprocessing
+import os
+
+import h5py
+import numpy as np
+
+from libero.libero import benchmark, get_libero_path
+from libero.libero.envs.env_wrapper import ControlEnv
+from libero.libero.utils.utils import postprocess_model_xml
+from detection.libero_10_object_prescence_detector import Libero10ObjectDetector
+from detection.libero_10_object_relation_detector import Libero10ObjectRelationDetector
+from detection.libero_10_action_state_subgoal_detector import Libero10ActionDetector
+from detection.libero_spatial_object_relation_detector import LiberoSpatialObjectRelationDetector
+from detection.libero_spatial_action_state_subgoal_detector import LiberoSpatialActionDetector
+from detection.libero_object_object_relation_detector import LiberoObjectObjectRelationDetector
+from detection.libero_object_action_state_subgoal_detector import LiberoObjectActionDetector
+
+LIBERO_10_DETECTORS = {
+    "object": Libero10ObjectDetector,
+    "relation": Libero10ObjectRelationDetector,
+    "action": Libero10ActionDetector,
+}
+
+# the detectors the interactive auto_label_symbolic_states_<suite>.py scripts use for each suite. libero_90 has no
+# detectors: the LIBERO_10 ones only ground the objects of the LIBERO_10 scenes, so most of its objects would be missed
+DETECTORS = {
+    "libero_10": LIBERO_10_DETECTORS,
+    "libero_goal": LIBERO_10_DETECTORS,
+    "libero_spatial": {
+        "relation": LiberoSpatialObjectRelationDetector,
+        "action": LiberoSpatialActionDetector,
+    },
+    "libero_object": {
+        "relation": LiberoObjectObjectRelationDetector,
+        "action": LiberoObjectActionDetector,
+    },
+}
+
+# the environment of the task the worker labeled last, reused as long as its jobs come from the same task
+_worker_cache = {"bddl_file": None, "env": None}
+
+
+def _get_env(bddl_file):
+    if _worker_cache["bddl_file"] != bddl_file:
+        if _worker_cache["env"] is not None:
+            _worker_cache["env"].close()
+        env = ControlEnv(
+            bddl_file_name=bddl_file,
+            has_renderer=False,
+            has_offscreen_renderer=False,
+            use_camera_obs=False,
+        )
+        env.seed(0)
+        env.reset()
+        _worker_cache["bddl_file"] = bddl_file
+        _worker_cache["env"] = env
+    return _worker_cache["env"]
+
+
+def label_demo(job):
+    """Replays the states of one demonstration and detects the symbolic states at each of them.
+
+    Args:
+        job (tuple): the benchmark name, the task's bddl file, the hdf5 file, the demo key, the model xml the demo
+            was recorded with (None if it was not stored) and the (T, D) flattened states
+
+    Returns:
+        tuple: the hdf5 file, the demo key and, per detector, its symbols and the (T, num_symbols) int8 labels
+    """
+    benchmark_name, bddl_file, hdf5_file, demo, model_xml, states = job
+    env = _get_env(bddl_file)
+    if model_xml is not None:
+        env.reset_from_xml_string(postprocess_model_xml(model_xml, {}))
+    env.set_init_state(states[0])
+    detectors = {
+        name: detector_class(env.env, return_int=True)
+        for name, detector_class in DETECTORS[benchmark_name].items()
+    }
+    labels = {
+        name: np.empty((len(states), len(detector.get_symbols())), dtype=np.int8)
+        for name, detector in detectors.items()
+    }
+    for t, state in enumerate(states):
+        # the detectors only read the simulation, so no observation has to be regenerated
+        env.restore_sim_state(state)
+        for name, detector in detectors.items():
+            labels[name][t] = detector.detect_vector()
+    return hdf5_file, demo, {
+        name: (detector.get_symbols(), labels[name])
+        for name, detector in detectors.items()
+    }
+
+
+def write_labels(f, demo, labels, chunk_len=256):
+    """Writes the labels of one demonstration as chunked int8 datasets, and the symbols of each detector once per file."""
+    demo_grp = f[f"data/{demo}"]
+    if "symbolic_states" in demo_grp:
+        del demo_grp["symbolic_states"]
+    states_grp = demo_grp.create_group("symbolic_states")
+    symbols_grp = f.require_group("symbols")
+    for name, (symbols, vectors) in labels.items():
+        states_grp.create_dataset(
+            name,
+            data=vectors,
+            chunks=(min(chunk_len, len(vectors)), vectors.shape[1]),
+            compression="gzip",
+        )
+        if name in symbols_grp:
+            del symbols_grp[name]
+        symbols_grp.create_dataset(name, data=symbols, dtype=h5py.string_dtype())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--benchmark", type=str, default="libero_10", choices=list(DETECTORS.keys()))
+    parser.add_argument(
+        "--dataset-path",
+        type=str,
+        default=get_libero_path("datasets"),
+    )
+    parser.add_argument("--task-ids", type=int, nargs="+", default=None)
+    parser.add_argument("--num-workers", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="relabel the demonstrations that already have symbolic states",
+    )
+    args = parser.parse_args()
+
+    task_suite = benchmark.get_benchmark_dict()[args.benchmark]()
+    task_ids = args.task_ids if args.task_ids is not None else list(range(task_suite.n_tasks))
+
+    # jobs are grouped by task so that the workers can keep reusing the same environment
+    jobs = []
+    for task_id in task_ids:
+        bddl_file = task_suite.get_task_bddl_file_path(task_id)
+        hdf5_file = os.path.join(args.dataset_path, task_suite.get_task_demonstration(task_id))
+        if not os.path.exists(hdf5_file):
+            print(f"[warning] {hdf5_file} does not exist, skipping task {task_id}")
+            continue
+        with h5py.File(hdf5_file, "r") as f:
+            for demo in sorted(f["data"].keys(), key=lambda demo: int(demo.split("_")[-1])):
+                demo_grp = f[f"data/{demo}"]
+                if "symbolic_states" in demo_grp and not args.overwrite:
+                    continue
+                model_xml = demo_grp.attrs.get("model_file")
+                jobs.append((args.benchmark, bddl_file, hdf5_file, demo, model_xml, demo_grp["states"][()]))
+    print(f"[info] labeling {len(jobs)} demonstrations of {args.benchmark} with {args.num_workers} workers")
+
+    # only the main process writes, since hdf5 files can not be written concurrently. The files are closed even if a
+    # worker fails, so that they are not left locked or with unflushed metadata
+    files = {}
+    ctx = multiprocessing.get_context("spawn")
+    with contextlib.ExitStack() as stack, ctx.Pool(args.num_workers) as pool:
+        for i, (hdf5_file, demo, labels) in enumerate(pool.imap_unordered(label_demo, jobs)):
+            if hdf5_file not in files:
+                files[hdf5_file] = stack.enter_context(h5py.File(hdf5_file, "a"))
+            write_labels(files[hdf5_file], demo, labels)
+            print(f"[info] {i + 1}/{len(jobs)} labeled {demo} of {os.path.basename(hdf5_file)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+This script measures how long importing the libero packages takes, each in a fresh interpreter, to track the startup
+cost paid by every script, evaluation worker and test. It reports the median wall time over the runs and, from
+`python -X importtime`, the modules with the largest cumulative import time.
+
+Example usage:
+
+    python benchmark_scripts/import_time.py --modules libero.libero.benchmark libero.libero.envs --runs 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+DEFAULT_MODULES = [
+    "libero.libero",
+    "libero.libero.benchmark",
+    "libero.libero.envs",
+    "libero.libero.envs.env_wrapper",
+    "libero.lifelong.metric",
+]
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), "../")
+
+
+def time_import(module, runs):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([REPO_ROOT, env.get("PYTHONPATH", "")])
+    times = []
+    for _ in range(runs):
+        t0 = time.time()
+        subprocess.run(
+            [sys.executable, "-c", f"import {module}"],
+            env=env,
+            check=True,
+            stdin=subprocess.DEVNULL,
+        )
+        times.append(time.time() - t0)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        check=True,
+        stdin=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    # lines look like "import time:  self [us] | cumulative | imported package"
+    imports = []
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if not line.startswith("import time:") or not fields[1].strip().isdigit():
+            continue
+        imports.append((int(fields[1]), fields[2].strip()))
+    return np.median(times), sorted(imports, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", type=str, nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--top", type=int, default=10, help="number of slowest imports to show"
+    )
+    args = parser.parse_args()
+
+    for module in args.modules:
+        try:
+            median_time, imports = time_import(module, args.runs)
+        except subprocess.CalledProcessError:
+            print(f"[error] failed to import {module}")
+            continue
+        print(f"[info] import {module}: {median_time:.3f} seconds (median of {args.runs})")
+        for cumulative_us, name in imports[: args.top]:
+            print(f"\t{cumulative_us / 1e6:7.3f} s  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,30 @@
 import itertools
+import numpy as np
 from typing import *
 
 class Detector:
+    # spatial predicates that can be evaluated for all object pairs with one broadcast.
+    # maps the predicate function name to (axis, sign): obj1 lies entirely on the negative (-1)
+    # or positive (+1) side of obj2 along the given axis of the half bounding boxes
+    SPATIAL_RELATIONS = {
+        'left_of': (1, -1),
+        'right_of': (1, 1),
+        'behind': (0, -1),
+        'in_front_of': (0, 1),
+    }
+
     def __init__(self, env, return_int=False):
         self.env = env
         self.obs = self.env.viewer._get_observations() if self.env.viewer_get_obs else self.env._get_observations() # detect objects' state using the observation
         self.return_int = return_int
 
         self.grounded_object_to_pddl_object = {}
+        # names of the objects, fixtures, regions and robots in the loaded task, None if the env has no parsed problem
+        self.present_objects = self._get_present_objects()
+        # ids, sizes and states resolved from the env's current sim, see `_get_handles()`
+        self._handles = None
+        # compiled from self.predicates and self.object_types on first use, since subclasses define them after this constructor
+        self._grounding_plan = None
 
     def get_env(self):
         return self.env
@@ -17,6 +34,9 @@ class Detector:
     
     def set_env(self, env):
         self.env = env
+        self.present_objects = self._get_present_objects()
+        self._grounding_plan = None
+        self.invalidate_handles()
 
     def update_obs(self, obs=None):
         """update the observation
@@ -29,32 +49,176 @@ class Detector:
         else:
             self.obs = self.env.viewer._get_observations() if self.env.viewer_get_obs else self.env._get_observations()
     
-    def detect_binary_states(self) -> dict:
+    def detect_binary_states(self, batched=True) -> dict:
         """Returns the groundings for the coffee detector.
 
+        Args:
+            batched (bool, optional): evaluate the spatial predicates (left-of, right-of, behind, in-front-of) for all object pairs at once. Defaults to True.
+
         Returns:
             dict: the groundings for the coffee detector
         """
-        groundings = {}
+        return dict(zip(self.get_symbols(), self.detect_vector(batched=batched).tolist()))
+
+    def detect_vector(self, batched=True) -> np.ndarray:
+        """Returns the truth values of all groundings aligned to `get_symbols()`.
+
+        Args:
+            batched (bool, optional): evaluate the spatial predicates (left-of, right-of, behind, in-front-of) for all object pairs at once. Defaults to True.
+
+        Returns:
+            np.ndarray: int8 array with 1 for True, 0 for False and -1 for not applicable
+        """
+        plan = self._get_grounding_plan()
+        vector = np.empty(len(plan['symbols']), dtype=np.int8)
+        # groundings over objects missing from the task are never evaluated
+        vector[plan['absent_mask']] = -1
+        # object name -> (position, half bounding box), gathered at most once per call
+        bounding_boxes = {}
+        for entry in plan['predicates']:
+            if batched and entry['relation'] is not None:
+                relation_matrix = self._spatial_relation_matrix(entry['relation'], entry['params'][0], entry['params'][1], bounding_boxes)
+                vector[entry['out_index']] = relation_matrix[entry['arg_index'][:, 0], entry['arg_index'][:, 1]]
+                continue
+            callable_func = entry['func']
+            for out, comb in zip(entry['out_index'], entry['args']):
+                vector[out] = self.r_int(callable_func(*comb))
+        return vector
+
+    def get_symbols(self) -> List[str]:
+        """Returns the grounded predicate names in the order used by `detect_vector()`.
+
+        Returns:
+            List[str]: the sorted grounded predicate names, e.g. 'on plate_1 flat_stove_1'
+        """
+        return self._get_grounding_plan()['symbols']
+
+    def _get_grounding_plan(self) -> dict:
+        if self._grounding_plan is None:
+            self._grounding_plan = self._compile_groundings()
+        return self._grounding_plan
+
+    def _get_present_objects(self) -> Optional[Set[str]]:
+        """Collects the names that can appear as predicate arguments in the loaded task.
+
+        Returns:
+            Optional[Set[str]]: the task's objects, fixtures, regions and robots, or None if the env has no parsed problem
+        """
+        parsed_problem = getattr(self.env, 'parsed_problem', None)
+        if parsed_problem is None:
+            return None
+        present_objects = set()
+        for category in ['objects', 'fixtures']:
+            for objs in parsed_problem[category].values():
+                present_objects.update(objs)
+        present_objects.update(parsed_problem['regions'].keys())
+        present_objects.update(f'robot{i}' for i in range(len(getattr(self.env, 'robots', []))))
+        return present_objects
+
+    def _compile_groundings(self) -> dict:
+        """Grounds every predicate over its parameter types once, so that detection only has to evaluate them.
+
+        Groundings that mention an object absent from the task are left out of the evaluation and reported as -1 through
+        the plan's 'absent_mask', unless the predicate sets 'prune_absent' to False.
+
+        Returns:
+            dict: the sorted 'symbols', the 'absent_mask' and, per predicate, the argument combinations and their positions in the symbol index
+        """
+        groundings = []
         for predicate_name, predicate in self.predicates.items():
             param_list = []
             # e.g. for predicate_name = 'inside', predicate['params'] = ['tabletop_object', 'container']
             for param_type in predicate['params']:
                 # e.g. for predicate_name = 'inside', param_list = [['coffee_pod', 'coffee_machine_lid', 'coffee_pod_holder', 'mug', 'drawer'], ['coffee_pod_holder', 'drawer', 'mug']]
-                param_list.append(self.object_types[param_type])
-            # e.g param_combinations = [('coffee_pod', 'coffee_pod_holder'), ('coffee_pod', 'drawer'), ('coffee_pod', 'mug'), ('coffee_machine_lid', 'coffee_pod_holder'), ('coffee_machine_lid', 'drawer'), ('coffee_machine_lid', 'mug'), ('coffee_pod_holder', 'coffee_pod_holder'), ('coffee_pod_holder', 'drawer'), ('coffee_pod_holder', 'mug'), ('mug', 'coffee_pod_holder'), ('mug', 'drawer'), ('mug', 'mug'), ('drawer', 'coffee_pod_holder'), ('drawer', 'drawer'), ('drawer', 'mug')]
-            param_combinations = list(itertools.product(*param_list))
-            callable_func = predicate['func']
-            for comb in param_combinations:
-                predicate_str = f'{predicate_name} {" ".join(comb)}'
+                param_list.append(list(self.object_types[param_type]))
+            prune = self.present_objects is not None and predicate.get('prune_absent', True)
+            # the lists the predicate is actually evaluated over, e.g. [['mug'], ['drawer', 'mug']] if only those are in the task
+            eval_param_list = [[obj for obj in objs if obj in self.present_objects] for objs in param_list] if prune else param_list
+            eval_positions = [{obj: i for i, obj in enumerate(objs)} for objs in eval_param_list]
+            for comb in itertools.product(*param_list):
                 # skip if the same object is used twice
                 if len(set(comb)) < len(comb):
                     continue
-                truth_value = callable_func(*comb)
-                groundings[predicate_str] = self.r_int(truth_value)
-        # sort the keys of the dictionary
-        groundings = dict(sorted(groundings.items()))
-        return groundings
+                if all(obj in positions for obj, positions in zip(comb, eval_positions)):
+                    index_comb = tuple(positions[obj] for obj, positions in zip(comb, eval_positions))
+                else:
+                    index_comb = None
+                groundings.append((f'{predicate_name} {" ".join(comb)}', predicate_name, eval_param_list, comb, index_comb))
+        # sort the groundings by their names
+        groundings.sort(key=lambda grounding: grounding[0])
+
+        predicates = {}
+        absent_mask = np.zeros(len(groundings), dtype=bool)
+        for out, (_, predicate_name, param_list, comb, index_comb) in enumerate(groundings):
+            if index_comb is None:
+                absent_mask[out] = True
+                continue
+            if predicate_name not in predicates:
+                callable_func = self.predicates[predicate_name]['func']
+                relation = self.SPATIAL_RELATIONS.get(callable_func.__name__) if len(param_list) == 2 else None
+                predicates[predicate_name] = {'func': callable_func, 'relation': relation, 'params': param_list, 'args': [], 'arg_index': [], 'out_index': []}
+            predicates[predicate_name]['args'].append(comb)
+            predicates[predicate_name]['arg_index'].append(index_comb)
+            predicates[predicate_name]['out_index'].append(out)
+        for entry in predicates.values():
+            entry['arg_index'] = np.array(entry['arg_index'], dtype=np.intp).reshape(len(entry['args']), len(entry['params']))
+            entry['out_index'] = np.array(entry['out_index'], dtype=np.intp)
+        return {
+            'symbols': [grounding[0] for grounding in groundings],
+            'absent_mask': absent_mask,
+            'predicates': list(predicates.values()),
+        }
+
+    def _spatial_relation_matrix(self, relation:Tuple[int, int], objs1:List[str], objs2:List[str], bounding_boxes:Optional[dict]=None) -> np.ndarray:
+        """Evaluates a spatial relation between every pair of objects with a single broadcast.
+
+        Args:
+            relation (Tuple[int, int]): the (axis, sign) of the relation, see `SPATIAL_RELATIONS`
+            objs1 (List[str]): the names of the first arguments
+            objs2 (List[str]): the names of the second arguments
+            bounding_boxes (dict, optional): cache of already gathered positions and half bounding boxes. Defaults to None.
+
+        Returns:
+            np.ndarray: int8 matrix of shape (len(objs1), len(objs2)), 1 for True, 0 for False and -1 if either object is missing
+        """
+        axis, sign = relation
+        pos1, half1, valid1 = self._get_object_positions_half_bounding_boxes(objs1, bounding_boxes)
+        pos2, half2, valid2 = self._get_object_positions_half_bounding_boxes(objs2, bounding_boxes)
+        if sign < 0:
+            # e.g. left_of: obj1's rightmost point is smaller than obj2's leftmost point
+            relation_matrix = (pos1[:, None, axis] + half1[:, None, axis]) < (pos2[None, :, axis] - half2[None, :, axis])
+        else:
+            # e.g. right_of: obj1's leftmost point is larger than obj2's rightmost point
+            relation_matrix = (pos1[:, None, axis] - half1[:, None, axis]) > (pos2[None, :, axis] + half2[None, :, axis])
+        relation_matrix = relation_matrix.astype(np.int8)
+        relation_matrix[~(valid1[:, None] & valid2[None, :])] = -1
+        return relation_matrix
+
+    def _get_object_positions_half_bounding_boxes(self, objs:List[str], bounding_boxes:Optional[dict]=None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Gathers the positions and half bounding boxes of the objects into arrays.
+
+        Args:
+            objs (List[str]): the object names
+            bounding_boxes (dict, optional): cache of already gathered positions and half bounding boxes. Defaults to None.
+
+        Returns:
+            tuple: the (N, 3) positions, the (N, 3) half bounding boxes and the (N,) mask of objects present in the environment
+        """
+        if bounding_boxes is None:
+            bounding_boxes = {}
+        positions = np.zeros((len(objs), 3))
+        half_bounding_boxes = np.zeros((len(objs), 3))
+        valid = np.zeros(len(objs), dtype=bool)
+        for i, obj in enumerate(objs):
+            if obj not in bounding_boxes:
+                bounding_boxes[obj] = self._get_object_position_half_bounding_box(obj)
+            pos, bounding_box = bounding_boxes[obj]
+            if pos is None:
+                continue
+            positions[i] = pos
+            half_bounding_boxes[i] = bounding_box
+            valid[i] = True
+        return positions, half_bounding_boxes, valid
     
     def r_int(self, value):
         # True is 1, False is 0, None is -1
@@ -62,6 +226,48 @@ class Detector:
             return -1
         return int(value)
     
+    def invalidate_handles(self):
+        """Drops the resolved handles so that they are looked up again on the next predicate call.
+
+        This happens automatically when the env builds a new sim (e.g. `reset_from_xml_string` or a hard reset), call it
+        if the objects of the env are changed in place.
+        """
+        self._handles = None
+
+    def _get_handles(self) -> dict:
+        """Returns the handles resolved for the env's current sim, resolving them again if the sim has been rebuilt.
+
+        Returns:
+            dict: the handle table, see `_resolve_handles()`
+        """
+        if self._handles is None or self._handles['sim'] is not self.env.sim:
+            self._handles = self._resolve_handles()
+        return self._handles
+
+    def _resolve_handles(self) -> dict:
+        """Resolves the names used by the predicates into the env's objects and body ids once.
+
+        The joint predicates (open, closed, turned on, ...) keep going through the object states, which know the joint
+        ranges of each object.
+
+        Returns:
+            dict: the sim the handles belong to, the env 'objects' (objects take precedence over fixtures with the same name),
+                their 'body_ids', the 'states' of objects and regions, and lazily filled 'half_bounding_boxes' and
+                'region_states' caches
+        """
+        sim = self.env.sim
+        objects = {}
+        for env_obj in list(self.env.objects) + list(self.env.fixtures): # fixtures are objects that are not movable
+            objects.setdefault(env_obj.name, env_obj)
+        return {
+            'sim': sim,
+            'objects': objects,
+            'body_ids': self.env.obj_body_id,
+            'states': self.env.object_states_dict,
+            'half_bounding_boxes': {},
+            'region_states': {},
+        }
+
     def _get_env_object(self, obj:str):
         """Returns the object from the environment.
 
@@ -71,13 +277,24 @@ class Detector:
         Returns:
             object: the object from the environment
         """
-        for env_obj in self.env.objects:
-            if env_obj.name == obj:
-                return env_obj
-        for env_obj in self.env.fixtures: # fixtures are objects that are not movable
-            if env_obj.name == obj:
-                return env_obj
-        return None
+        return self._get_handles()['objects'].get(obj)
+
+    def _get_region_states(self, obj_type:str) -> list:
+        """Returns the states whose names contain one of the objects of the given type, e.g. the regions of the tables.
+
+        Args:
+            obj_type (str): the object type, e.g. 'table'
+
+        Returns:
+            list: the matching object and region states
+        """
+        handles = self._get_handles()
+        if obj_type not in handles['region_states']:
+            handles['region_states'][obj_type] = [
+                region_state for name, region_state in handles['states'].items()
+                if any(obj in name for obj in self.object_types[obj_type])
+            ]
+        return handles['region_states'][obj_type]
     
     def _get_object_position_half_bounding_box(self, obj:str) -> Tuple[List[float], List[float]]:
         """Returns the position and half bounding box of the object.
@@ -88,14 +305,18 @@ class Detector:
         Returns:
             tuple: the half bounding box position of the object
         """
-        env_obj = self._get_env_object(obj)
+        handles = self._get_handles()
+        env_obj = handles['objects'].get(obj)
         if env_obj is None:
             return None, None
-        bounding_box = env_obj.get_bounding_box_half_size()
-        if env_obj.name == 'wooden_cabinet_1' or env_obj.name == 'white_cabinet_1': # a hack to fix the cabinet position
-            bounding_box = env_obj.get_bounding_box_size() + [0, 0.05, 0]# the cabinet's half bounding box is too small
+        bounding_box = handles['half_bounding_boxes'].get(obj)
+        if bounding_box is None:
+            bounding_box = env_obj.get_bounding_box_half_size()
+            if env_obj.name == 'wooden_cabinet_1' or env_obj.name == 'white_cabinet_1': # a hack to fix the cabinet position
+                bounding_box = env_obj.get_bounding_box_size() + [0, 0.05, 0]# the cabinet's half bounding box is too small
+            handles['half_bounding_boxes'][obj] = bounding_box
         pos = self.env.sim.data.body_xpos[
-            self.env.obj_body_id[obj]
+            handles['body_ids'][obj]
         ]
         return pos, bounding_box
     
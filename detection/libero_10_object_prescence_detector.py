@@ -108,7 +108,9 @@ class Libero10ObjectDetector(Detector):
         self.predicates = {
             'present': {
                 'func':self.present,
-                'params':['tabletop-object']
+                'params':['tabletop-object'],
+                # absent objects are reported as not present rather than not applicable
+                'prune_absent': False
             }
 
         }
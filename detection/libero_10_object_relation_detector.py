@@ -282,18 +282,12 @@ class Libero10ObjectRelationDetector(Detector):
         Returns:
             bool: True if the object is directly on the table              
         '''
-        def find_table_regions():
-            table_regions = [region_state for region_state in self.env.object_states_dict.keys() if any(table in region_state for table in self.object_types['table'])]
-            return table_regions
-        
         assert self._is_type(tabletop_obj, 'tabletop-object')
         obj_state = self.env.object_states_dict.get(tabletop_obj)
         if obj_state is None:
             return None
-        table_regions = find_table_regions()
         # see if the object is in any of the detectable table regions. These are the regions in which objects are initialized on the table. They don't cover the entire table, but they are good enough for this purpose since objects stay in their table regions during successful episodes and we only collect successful episodes.
-        for region in table_regions:
-            region_state = self.env.object_states_dict[region]
+        for region_state in self._get_region_states('table'):
             if region_state.check_ontop(obj_state) or region_state.check_contact(obj_state):
                 return True
         return False
@@ -40,7 +40,9 @@ class LiberoSpatialActionDetector(Libero10ActionDetector):
             },
             'should-move-towards': {
                 'func':self.should_move_towards,
-                'params':['tabletop-object']
+                'params':['tabletop-object'],
+                # absent objects are never the object of interest, so they are False rather than not applicable
+                'prune_absent': False
             }
         }
 
@@ -2,11 +2,11 @@ import abc
 import os
 import glob
 import random
-import torch
 
 from typing import List, NamedTuple, Type
 from libero.libero import get_libero_path
 from libero.libero.benchmark.libero_suite_task_map import libero_task_map
+from libero.libero.benchmark.init_states_store import load_init_states
 
 BENCHMARK_MAPPING = {}
 
@@ -156,13 +156,11 @@ class Benchmark(abc.ABC):
         return self.task_embs[i]
 
     def get_task_init_states(self, i):
-        init_states_path = os.path.join(
+        return load_init_states(
             get_libero_path("init_states"),
             self.tasks[i].problem_folder,
             self.tasks[i].init_states_file,
         )
-        init_states = torch.load(init_states_path, weights_only=False)
-        return init_states
 
     def set_task_embs(self, task_embs):
         self.task_embs = task_embs
@@ -0,0 +1,172 @@
+import functools
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from libero.libero import libero_config_path
+
+# The init states of each suite are converted once into one flat array stored as .npy,
+# which is memory-mapped instead of unpickling one file per task, and an index of where
+# the states of each task are in it
+INIT_STATES_STORE_DIR = os.environ.get(
+    "LIBERO_INIT_STATES_STORE_DIR",
+    os.path.join(libero_config_path, "init_states_store"),
+)
+INIT_STATES_EXTENSIONS = [".pruned_init", ".init"]
+
+
+def _load_pickled_init_states(init_states_path):
+    # torch is only imported to convert the init states files
+    import torch
+
+    return np.asarray(torch.load(init_states_path, weights_only=False))
+
+
+def _get_file_signature(path):
+    file_stat = os.stat(path)
+    return [file_stat.st_size, file_stat.st_mtime_ns]
+
+
+class InitStatesStore:
+    """
+    The memory-mapped init states of all the tasks of one suite folder, e.g. the
+    libero_10 folder of init_files.
+
+    Args:
+        init_states_folder (str): the folder of the init states of all the suites
+        problem_folder (str): the folder of the suite in init_states_folder
+        store_dir (str): the directory of the converted stores
+    """
+
+    def __init__(
+        self, init_states_folder, problem_folder, store_dir=INIT_STATES_STORE_DIR
+    ):
+        self.suite_folder = os.path.abspath(
+            os.path.join(init_states_folder, problem_folder)
+        )
+        # suites with the same name in different init states folders must not collide
+        folder_hash = hashlib.sha1(self.suite_folder.encode()).hexdigest()[:8]
+        self.store_dir = os.path.join(store_dir, f"{problem_folder}-{folder_hash}")
+        self.index_file = os.path.join(self.store_dir, "index.json")
+        self.index = None
+        self.states = None
+
+    def get(self, init_states_file):
+        """
+        Returns the (num_init_states, state_dim) init states of a task as a read-only
+        view of the store, converting the suite folder again if the file is not in the
+        store or changed since it was converted.
+        """
+        init_states_path = os.path.join(self.suite_folder, init_states_file)
+        if not self._is_up_to_date(init_states_path, init_states_file):
+            self._load()
+            if not self._is_up_to_date(init_states_path, init_states_file):
+                self._convert()
+                self._load()
+        assert (
+            init_states_file in self.index["files"]
+        ), f"[error] {init_states_path} does not exist!"
+        offset, shape = self.index["files"][init_states_file]["slice"]
+        return self.states[offset : offset + int(np.prod(shape))].reshape(shape)
+
+    def _is_up_to_date(self, init_states_path, init_states_file):
+        if self.index is None:
+            return False
+        entry = self.index["files"].get(init_states_file)
+        if not os.path.exists(init_states_path):
+            # the file can still be served if only the store is available
+            return entry is not None
+        return entry is not None and entry["signature"] == _get_file_signature(
+            init_states_path
+        )
+
+    def _load(self, retry=True):
+        if not os.path.exists(self.index_file):
+            self.index, self.states = None, None
+            return
+        with open(self.index_file, "r") as f:
+            self.index = json.load(f)
+        try:
+            self.states = np.load(
+                os.path.join(self.store_dir, self.index["states_file"]), mmap_mode="r"
+            )
+        except FileNotFoundError:
+            # another process converted the store again and removed the states file
+            # between reading the index and the states, the new index points to its
+            # replacement
+            if not retry:
+                raise
+            self._load(retry=False)
+
+    def _convert(self):
+        files = {}
+        states = []
+        offset = 0
+        for init_states_path in sorted(
+            path
+            for extension in INIT_STATES_EXTENSIONS
+            for path in glob.glob(os.path.join(self.suite_folder, f"*{extension}"))
+        ):
+            init_states = _load_pickled_init_states(init_states_path).astype(
+                np.float64
+            )
+            files[os.path.basename(init_states_path)] = {
+                "signature": _get_file_signature(init_states_path),
+                "slice": [offset, list(init_states.shape)],
+            }
+            states.append(init_states.reshape(-1))
+            offset += init_states.size
+        states = np.concatenate(states) if len(states) > 0 else np.zeros(0)
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        # the states file is named after its content and the index pointing to it is
+        # replaced last, so that processes reading the store while it is converted
+        # again always get a consistent pair
+        files_hash = hashlib.sha1(json.dumps(files, sort_keys=True).encode())
+        states_file = f"states-{files_hash.hexdigest()}.npy"
+        _atomic_write(self.store_dir, states_file, lambda f: np.save(f, states))
+        _atomic_write(
+            self.store_dir,
+            "index.json",
+            lambda f: f.write(
+                json.dumps({"states_file": states_file, "files": files}).encode()
+            ),
+        )
+        for old_states_file in glob.glob(os.path.join(self.store_dir, "states-*.npy")):
+            if os.path.basename(old_states_file) != states_file:
+                try:
+                    os.remove(old_states_file)
+                except FileNotFoundError:
+                    # already removed by another process converting the store again
+                    pass
+
+
+def _atomic_write(directory, file_name, write_fn):
+    fd, tmp_file = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_fn(f)
+        os.replace(tmp_file, os.path.join(directory, file_name))
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+@functools.lru_cache(maxsize=16)
+def get_init_states_store(init_states_folder, problem_folder):
+    """Returns the init states store of a suite folder, kept open by the process."""
+    return InitStatesStore(init_states_folder, problem_folder)
+
+
+def load_init_states(init_states_folder, problem_folder, init_states_file):
+    """
+    Returns the init states of a task, read from the memory-mapped store of its suite.
+    The returned array is read-only, and indexing it, e.g. init_states[indices], only
+    reads the selected states.
+    """
+    store = get_init_states_store(init_states_folder, problem_folder)
+    return store.get(init_states_file)
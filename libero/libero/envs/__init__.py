@@ -1,7 +1,44 @@
-from .bddl_base_domain import TASK_MAPPING
+import importlib
+
+from .registry import TASK_MAPPING
 from .base_object import OBJECTS_DICT
-from .problems import *
-from .robots import *
-from .arenas import *
-from .env_wrapper import OffScreenRenderEnv, SegmentationRenderEnv
-from .venv import SubprocVectorEnv, DummyVectorEnv
+
+# The envs and vector envs are imported when they are first used, and the problems, robots
+# and arenas, which import robosuite, when the problem of an env is first requested from
+# TASK_MAPPING, or by `from libero.libero.envs import *`.
+_LAZY_ATTRIBUTES = {
+    "OffScreenRenderEnv": ".env_wrapper",
+    "SegmentationRenderEnv": ".env_wrapper",
+    "SubprocVectorEnv": ".venv",
+    "DummyVectorEnv": ".venv",
+}
+_STAR_MODULES = [".problems", ".robots", ".arenas"]
+
+
+def _get_public_names(module):
+    if hasattr(module, "__all__"):
+        return list(module.__all__)
+    return [name for name in vars(module) if not name.startswith("_")]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    if name == "__all__":
+        # everything the package used to import eagerly, including its submodules
+        for module_name in _STAR_MODULES:
+            module = importlib.import_module(module_name, __name__)
+            for public_name in _get_public_names(module):
+                globals()[public_name] = getattr(module, public_name)
+        for lazy_name in _LAZY_ATTRIBUTES:
+            __getattr__(lazy_name)
+        names = [
+            public_name
+            for public_name in globals()
+            if not public_name.startswith("_") and public_name != "importlib"
+        ]
+        globals()["__all__"] = names
+        return names
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,13 +1,16 @@
 import re
 
-OBJECTS_DICT = {}
+from libero.libero.envs.registry import LazyRegistry
+from libero.libero.envs.registry_index import OBJECT_INDEX
+
+OBJECTS_DICT = LazyRegistry(OBJECT_INDEX)
 VISUAL_CHANGE_OBJECTS_DICT = {}
 
 
 def register_object(target_class):
     """We design the mapping to be case-INsensitive."""
     key = "_".join(re.sub(r"([A-Z0-9])", r" \1", target_class.__name__).split()).lower()
-    assert key not in OBJECTS_DICT
+    assert not OBJECTS_DICT.is_loaded(key)
     OBJECTS_DICT[key] = target_class
     return target_class
 
@@ -4,10 +4,12 @@ import robosuite.utils.transform_utils as T
 
 from copy import deepcopy
 from robosuite.environments.manipulation.single_arm_env import SingleArmEnv
+from robosuite.models.base import MujocoModel
 from robosuite.models.tasks import ManipulationTask
 from robosuite.utils.placement_samplers import SequentialCompositeSampler
 from robosuite.utils.observables import Observable, sensor
 from robosuite.utils.mjcf_utils import CustomMaterial
+from robosuite.utils.binding_utils import MjSim
 import robosuite.macros as macros
 
 import mujoco
@@ -16,14 +18,30 @@ import libero.libero.envs.bddl_utils as BDDLUtils
 from libero.libero.envs.robots import *
 from libero.libero.envs.utils import *
 from libero.libero.envs.object_states import *
+from libero.libero.envs.predicates import *
 from libero.libero.envs.objects import *
 from libero.libero.envs.regions import *
 from libero.libero.envs.arenas import *
+from libero.libero.envs.model_cache import load_compiled_model
+from libero.libero.envs.registry import TASK_MAPPING
 
 
 DIR_PATH = os.path.dirname(os.path.realpath(__file__))
 
-TASK_MAPPING = {}
+# Relative cost of evaluating each goal predicate, used to check the cheap ones first.
+# Joint and position checks are cheaper than the contact based ones, and In checks both
+# contact and containment.
+GOAL_PREDICATE_COSTS = {
+    TruePredicateFn: 0,
+    FalsePredicateFn: 0,
+    Up: 1,
+    Open: 1,
+    Close: 1,
+    TurnOn: 1,
+    TurnOff: 1,
+    On: 2,
+    In: 3,
+}
 
 
 def register_problem(target_class):
@@ -75,9 +93,14 @@ class BDDLBaseDomain(SingleArmEnv):
         arena_type="table",
         scene_xml="scenes/libero_base_style.xml",
         scene_properties={},
+        use_model_cache=False,
         **kwargs,
     ):
         t0 = time.time()
+        # Reuse the compiled model of scenes that have been built before. Models loaded from the
+        # cache were not compiled from xml in this process, so sim.model.get_xml() can not be used
+        # on them; keep this off when recording demonstrations.
+        self.use_model_cache = use_model_cache
         # settings for table top (hardcoded since it's not an essential part of the environment)
         self.workspace_offset = workspace_offset
         # reward configuration
@@ -249,6 +272,38 @@ class BDDLBaseDomain(SingleArmEnv):
             )
         self.object_states_dict = object_states_dict
         self.tracking_object_states_change = tracking_object_states_changes
+        self._goal_program = self._compile_goal_state()
+
+    def _compile_goal_state(self):
+        """
+        Resolves the goal predicates of the bddl file into (predicate function, object states)
+        pairs once, ordered from the cheapest to the most expensive check, so that
+        _check_goal_state does not look anything up by name at every step.
+        """
+        goal_program = []
+        for state in self.parsed_problem["goal_state"]:
+            predicate_fn_name = state[0]
+            assert predicate_fn_name in get_predicate_fn_dict()
+            predicate_fn = get_predicate_fn_dict()[predicate_fn_name]
+            args = tuple(self.object_states_dict[object_name] for object_name in state[1:])
+            goal_program.append((predicate_fn, args))
+        # sorted is stable, so predicates of the same cost keep their order from the bddl file
+        return sorted(
+            goal_program,
+            key=lambda instruction: GOAL_PREDICATE_COSTS.get(
+                type(instruction[0]), max(GOAL_PREDICATE_COSTS.values())
+            ),
+        )
+
+    def _check_goal_state(self):
+        """
+        Check if the conjunction of the goal predicates holds, stopping at the first
+        predicate that does not.
+        """
+        for predicate_fn, args in self._goal_program:
+            if not predicate_fn(*args):
+                return False
+        return True
 
     def _load_distracting_objects(self, mujoco_arena):
         raise NotImplementedError
@@ -403,6 +458,25 @@ class BDDLBaseDomain(SingleArmEnv):
         )
         self._add_placement_initializer()
 
+    def _initialize_sim(self, xml_string=None):
+        """
+        Creates the MjSim like robosuite does, but loads the compiled model from the
+        model cache if use_model_cache is set.
+        """
+        if not self.use_model_cache:
+            return super()._initialize_sim(xml_string)
+
+        xml = xml_string if xml_string else self.model.get_xml()
+        # process the xml before initializing sim
+        if getattr(self, "_xml_processor", None) is not None:
+            xml = self._xml_processor(xml)
+
+        self.sim = MjSim(load_compiled_model(xml))
+        # run a single step to make sure changes have propagated through sim state
+        self.sim.forward()
+        # Setup sim time based on control frequency
+        self.initialize_time(self.control_freq)
+
     def _setup_references(self):
         """
         Sets up references to important components. A reference is typically an
@@ -424,6 +498,15 @@ class BDDLBaseDomain(SingleArmEnv):
                 fixture_body.root_body
             )
 
+        # Geom references used to answer contact queries, see check_contact
+        self.geom_name2id = dict()
+        for geom_id in range(self.sim.model.ngeom):
+            geom_name = self.sim.model.geom_id2name(geom_id)
+            if geom_name is not None:
+                self.geom_name2id[geom_name] = geom_id
+        self._model_geom_ids = dict()
+        self._contact_index = None
+
     def _setup_observables(self):
         """
         Sets up observables to be used for this environment. Creates object-based observables if enabled
@@ -775,6 +858,7 @@ class BDDLBaseDomain(SingleArmEnv):
                     body_id = self.sim.model.body_name2id(obj.root_body)
                     self.sim.model.body_pos[body_id] = obj_pos
                     self.sim.model.body_quat[body_id] = obj_quat
+        self.invalidate_contact_index()
 
     def _check_success(self):
         """
@@ -812,6 +896,8 @@ class BDDLBaseDomain(SingleArmEnv):
         super()._pre_action(action, policy_step=policy_step)
 
     def _post_action(self, action):
+        # the physics steps changed the contacts, before the reward checks them
+        self.invalidate_contact_index()
         reward, done, info = super()._post_action(action)
 
         self._post_process()
@@ -823,6 +909,78 @@ class BDDLBaseDomain(SingleArmEnv):
         for object_state in self.tracking_object_states_change:
             object_state.update_state()
 
+    def check_contact(self, geoms_1, geoms_2=None):
+        """
+        Same as robosuite's check_contact, but answered from an index of the touching
+        geoms instead of scanning the contact array for every query. The index is built
+        on the first query after it is invalidated, after a physics step, a reset or a
+        state restore, and shared by all the following queries.
+
+        Args:
+            geoms_1 (str or list of str or MujocoModel): an individual geom name or list of geom names or a model
+            geoms_2 (str or list of str or MujocoModel or None): another individual geom name or list of geom names
+                or a model. If None, will check any collision with geoms_1 to any other geom in the environment
+
+        Returns:
+            bool: True if any geom in @geoms_1 is in contact with any geom in @geoms_2
+        """
+        contact_index = self._get_contact_index()
+        if len(contact_index) == 0:
+            return False
+        geom_ids_1 = self._get_geom_ids(geoms_1)
+        if geoms_2 is None:
+            return any(geom_id in contact_index for geom_id in geom_ids_1)
+        geom_ids_2 = self._get_geom_ids(geoms_2)
+        return any(
+            not contact_index[geom_id].isdisjoint(geom_ids_2)
+            for geom_id in geom_ids_1
+            if geom_id in contact_index
+        )
+
+    def invalidate_contact_index(self):
+        """
+        Drops the contact index so that it is rebuilt on the next contact query. This is
+        done after every physics step, reset and state restore of the env and its
+        wrappers, call it after changing the sim state directly.
+        """
+        self._contact_index = None
+
+    def _get_contact_index(self):
+        """
+        Returns a mapping from each geom in contact to the set of geoms it touches,
+        built from the active contacts on the first query after it is invalidated.
+        """
+        if self._contact_index is None:
+            ncon = self.sim.data.ncon
+            contact_index = dict()
+            for geom_id_1, geom_id_2 in zip(
+                self.sim.data.contact.geom1[:ncon].tolist(),
+                self.sim.data.contact.geom2[:ncon].tolist(),
+            ):
+                contact_index.setdefault(geom_id_1, set()).add(geom_id_2)
+                contact_index.setdefault(geom_id_2, set()).add(geom_id_1)
+            self._contact_index = contact_index
+        return self._contact_index
+
+    def _get_geom_ids(self, geoms):
+        """
+        Converts a geom name, a list of geom names or a model into the set of
+        the corresponding geom ids. Names that are not in the model are ignored.
+        """
+        if isinstance(geoms, MujocoModel):
+            if geoms.name not in self._model_geom_ids:
+                self._model_geom_ids[geoms.name] = self._get_geom_ids(
+                    geoms.contact_geoms
+                )
+            return self._model_geom_ids[geoms.name]
+        if type(geoms) is str:
+            geoms = [geoms]
+        return {
+            self.geom_name2id[geom_name]
+            for geom_name in geoms
+            if geom_name in self.geom_name2id
+        }
+
     def get_robot_state_vector(self, obs):
         return np.concatenate(
             [obs["robot0_gripper_qpos"], obs["robot0_eef_pos"], obs["robot0_eef_quat"]]
@@ -1,10 +1,27 @@
 from bddl.parsing import *
 
+import copy
+import functools
+import hashlib
 import itertools
+import os
+import pickle
+import tempfile
 import numpy as np
 
+from libero.libero import libero_config_path
+
 pi = np.pi
 
+# The parsed problems are stored as pickles named after the path and content of their bddl
+# file, so that envs created in other processes do not scan the same file again. Bump the
+# version when changing the parsing below.
+PARSED_PROBLEM_CACHE_DIR = os.environ.get(
+    "LIBERO_PARSED_PROBLEM_CACHE_DIR",
+    os.path.join(libero_config_path, "parsed_problem_cache"),
+)
+PARSED_PROBLEM_CACHE_VERSION = 1
+
 
 def get_regions(t, regions, group):
     group.pop(0)
@@ -61,9 +78,91 @@ def get_scenes(t, scene_properties, group):
 
 
 def get_problem_info(problem_filename):
-    domain_name = "unknown"
-    problem_filename = problem_filename
+    problem_info = load_parsed_problem(problem_filename)["problem_info"]
+    if problem_info is None:
+        # raise the parsing error
+        return _get_problem_info(scan_tokens(filename=problem_filename))
+    return copy.deepcopy(problem_info)
+
+
+def robosuite_parse_problem(problem_filename):
+    parsed_problem = load_parsed_problem(problem_filename)["parsed_problem"]
+    if parsed_problem is None:
+        # raise the parsing error
+        return _robosuite_parse_problem(scan_tokens(filename=problem_filename))
+    return copy.deepcopy(parsed_problem)
+
+
+def load_parsed_problem(problem_filename, cache_dir=PARSED_PROBLEM_CACHE_DIR):
+    """
+    Returns the problem info and the parsed problem of a bddl file, scanning the file only
+    if it has not been parsed in this process or stored in cache_dir before. The returned
+    dict is shared by all the callers and must not be modified.
+
+    Args:
+        problem_filename (str): path to the bddl file
+        cache_dir (str): the directory of the pickled parsed problems
+
+    Returns:
+        dict: the "problem_info" and "parsed_problem", None if the file can not be parsed
+    """
+    problem_filename = os.path.abspath(problem_filename)
+    with open(problem_filename, "rb") as f:
+        content_hash = hashlib.sha1(f.read()).hexdigest()
+    return _load_parsed_problem(problem_filename, content_hash, cache_dir)
+
+
+@functools.lru_cache(maxsize=256)
+def _load_parsed_problem(problem_filename, content_hash, cache_dir):
+    key = hashlib.sha1(
+        f"{PARSED_PROBLEM_CACHE_VERSION}:{problem_filename}:{content_hash}".encode()
+    ).hexdigest()
+    name = os.path.splitext(os.path.basename(problem_filename))[0]
+    cache_file = os.path.join(cache_dir, f"{name}-{key}.pkl")
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, "rb") as f:
+                return pickle.load(f)
+        except (
+            EOFError,
+            OSError,
+            pickle.UnpicklingError,
+            AttributeError,
+            ImportError,
+            IndexError,
+            TypeError,
+            ValueError,
+        ):
+            # e.g. a file truncated by a full disk, or pickled before a refactor of the
+            # classes it refers to, parse it again below
+            pass
+
     tokens = scan_tokens(filename=problem_filename)
+    parsed = {}
+    for parsed_key, parse_fn in [
+        ("problem_info", _get_problem_info),
+        ("parsed_problem", _robosuite_parse_problem),
+    ]:
+        try:
+            parsed[parsed_key] = parse_fn(copy.deepcopy(tokens))
+        except Exception:
+            parsed[parsed_key] = None
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # write to a temporary file first so that envs created in parallel never read a partial pickle
+    fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".pkl.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(parsed, f)
+        os.replace(tmp_file, cache_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return parsed
+
+
+def _get_problem_info(tokens):
+    domain_name = "unknown"
     if isinstance(tokens, list) and tokens.pop(0) == "define":
         problem_name = "unknown"
         language_instruction = ""
@@ -84,10 +183,8 @@ def get_problem_info(problem_filename):
     }
 
 
-def robosuite_parse_problem(problem_filename):
+def _robosuite_parse_problem(tokens):
     domain_name = "robosuite"
-    problem_filename = problem_filename
-    tokens = scan_tokens(filename=problem_filename)
     if isinstance(tokens, list) and tokens.pop(0) == "define":
         problem_name = "unknown"
         objects = {}
@@ -1,3 +1,4 @@
+import copy
 import os
 import numpy as np
 import robosuite as suite
@@ -6,7 +7,31 @@ import matplotlib.cm as cm
 from robosuite.utils.errors import RandomizationError
 
 import libero.libero.envs.bddl_utils as BDDLUtils
-from libero.libero.envs import *
+from libero.libero.envs.init_state_bank import InitStateBank
+from libero.libero.envs.registry import TASK_MAPPING
+
+# The internals of the robosuite controllers and grippers that are not part of the sim
+# state, e.g. the goal pose of OSC, saved and restored with the state of an env
+CONTROLLER_STATE_KEYS = [
+    "goal_pos",
+    "goal_ori",
+    "relative_ori",
+    "ori_ref",
+    "goal_qpos",
+    "goal_vel",
+    "goal_torque",
+    "torques",
+]
+GRIPPER_STATE_KEYS = ["current_action"]
+
+# The observations whose robosuite sensors read the value of another observation from
+# the observation cache, by suffix, e.g. the depth of a camera is rendered together with
+# its image by the image sensor
+OBSERVATION_SOURCE_SUFFIXES = {
+    "_depth": "_image",
+    "_joint_pos_cos": "_joint_pos",
+    "_joint_pos_sin": "_joint_pos",
+}
 
 
 class ControlEnv:
@@ -38,6 +63,9 @@ class ControlEnv:
         camera_segmentations=None,
         renderer="mujoco",
         renderer_config=None,
+        obs_keys=None,
+        init_state_bank=None,
+        init_state_bank_fallback=True,
         **kwargs,
     ):
         assert os.path.exists(
@@ -79,6 +107,56 @@ class ControlEnv:
             renderer_config=renderer_config,
             **kwargs,
         )
+        self.obs_keys = obs_keys
+        if obs_keys is not None:
+            self._restrict_observables(obs_keys)
+
+        # reset draws the init states from the bank in this directory if it is given
+        self.init_state_bank = None
+        if init_state_bank is not None:
+            self.init_state_bank = InitStateBank.load(bddl_file_name, init_state_bank)
+            if self.init_state_bank is None:
+                assert (
+                    init_state_bank_fallback
+                ), f"[error] no init state bank of {bddl_file_name} in {init_state_bank}"
+                print(
+                    f"[warning] no init state bank of {bddl_file_name} in {init_state_bank}, sampling the init states live"
+                )
+
+    def _restrict_observables(self, obs_keys):
+        """
+        Only computes the observations in obs_keys, e.g. the ones a policy consumes. The cameras
+        no observation is requested from are not rendered anymore, and the object states are only
+        computed if an object observation is requested, since their sensors read each other's
+        values. The sensors filling the cached values of requested observations, e.g. the image
+        of a requested depth, keep being computed but are not returned. Observables persist
+        through resets, so this only has to be done once.
+        """
+        observables = self.env._observables
+        unknown_keys = [key for key in obs_keys if key not in observables]
+        assert (
+            len(unknown_keys) == 0
+        ), f"[error] unknown observation keys {unknown_keys}, available: {list(observables.keys())}"
+
+        use_object_obs = any(observables[key].modality == "object" for key in obs_keys)
+        source_keys = set(
+            key[: -len(suffix)] + source_suffix
+            for key in obs_keys
+            for suffix, source_suffix in OBSERVATION_SOURCE_SUFFIXES.items()
+            if key.endswith(suffix)
+        )
+        for name, observable in observables.items():
+            if name in obs_keys:
+                self.env.modify_observable(name, "enabled", True)
+                self.env.modify_observable(name, "active", True)
+            elif name in source_keys or (
+                observable.modality == "object" and use_object_obs
+            ):
+                # read from the observation cache by the requested observations
+                self.env.modify_observable(name, "enabled", True)
+                self.env.modify_observable(name, "active", False)
+            else:
+                self.env.modify_observable(name, "enabled", False)
 
     @property
     def obj_of_interest(self):
@@ -88,6 +166,9 @@ class ControlEnv:
         return self.env.step(action)
 
     def reset(self):
+        if self.init_state_bank is not None:
+            return self.reset_from_bank()
+
         success = False
         while not success:
             try:
@@ -99,7 +180,20 @@ class ControlEnv:
                 continue
 
         return ret
-    
+
+    def reset_from_bank(self):
+        """
+        Resets to an init state drawn from the init state bank. The placements are not
+        sampled and a hard reset does not rebuild the model, since the state of the whole
+        scene is then set from the bank, so this takes the same time at every episode.
+        """
+        self.env.deterministic_reset = True
+        try:
+            self.env.reset()
+        finally:
+            self.env.deterministic_reset = False
+        return self.set_init_state(self.init_state_bank.sample())
+
     def render(self):
         self.env.render()
 
@@ -129,6 +223,7 @@ class ControlEnv:
 
     def set_state(self, mujoco_state):
         self.env.sim.set_state_from_flattened(mujoco_state)
+        self.env.invalidate_contact_index()
 
     def reset_from_xml_string(self, xml_string):
         self.env.reset_from_xml_string(xml_string)
@@ -147,6 +242,92 @@ class ControlEnv:
         self._update_observables(force=True)
         return self.env._get_observations()
 
+    def restore_sim_state(self, mujoco_state):
+        """
+        Restores a flattened mujoco state without regenerating the observations. Forward
+        kinematics and contacts are recomputed so that object states and _check_success
+        are valid, but no camera is rendered.
+        """
+        self.set_state(mujoco_state)
+        self.env.sim.forward()
+        self._post_process()
+
+    def get_env_state(self):
+        """
+        Returns the flattened mujoco state together with the internals of the env and of
+        its controllers, from which set_env_state continues the episode exactly, e.g. to
+        roll out several futures of the same state in other envs of the same task.
+        """
+
+        def get_attributes(obj, keys):
+            return {
+                key: copy.deepcopy(getattr(obj, key)) for key in keys if hasattr(obj, key)
+            }
+
+        return {
+            "sim_state": self.get_sim_state(),
+            "timestep": self.env.timestep,
+            "cur_time": self.env.cur_time,
+            "done": self.env.done,
+            "controllers": [
+                get_attributes(robot.controller, CONTROLLER_STATE_KEYS)
+                for robot in self.env.robots
+            ],
+            "grippers": [
+                get_attributes(robot.gripper, GRIPPER_STATE_KEYS)
+                for robot in self.env.robots
+            ],
+        }
+
+    def set_env_state(self, env_state):
+        """
+        Restores a state returned by get_env_state, without regenerating the observations.
+        """
+        self.restore_sim_state(env_state["sim_state"])
+        self.env.timestep = env_state["timestep"]
+        self.env.cur_time = env_state["cur_time"]
+        self.env.done = env_state["done"]
+        for robot, controller_state, gripper_state in zip(
+            self.env.robots, env_state["controllers"], env_state["grippers"]
+        ):
+            for key, value in controller_state.items():
+                setattr(robot.controller, key, copy.deepcopy(value))
+            # the controller recomputes the robot state it depends on at its next step
+            robot.controller.new_update = True
+            for key, value in gripper_state.items():
+                setattr(robot.gripper, key, copy.deepcopy(value))
+
+    def rollout(self, actions):
+        """
+        Steps through the (num_steps, action_dim) actions without computing any
+        observation, and stops early once the task is succeeded.
+
+        Returns:
+            np.array: the flattened mujoco state at the end of the rollout
+            bool: whether the task is succeeded
+        """
+        observables = self.env._observables
+        # only the sim is needed, the observables are disabled during the rollout and
+        # restored afterwards
+        observable_flags = {
+            name: (observable.is_enabled(), observable.is_active())
+            for name, observable in observables.items()
+        }
+        for name in observables:
+            self.env.modify_observable(name, "enabled", False)
+        success = self.check_success()
+        try:
+            for action in actions:
+                if success or self.env.done:
+                    break
+                # the problems return whether the task is succeeded as done
+                _, _, success, _ = self.env.step(action)
+        finally:
+            for name, (enabled, active) in observable_flags.items():
+                self.env.modify_observable(name, "enabled", enabled)
+                self.env.modify_observable(name, "active", active)
+        return self.get_sim_state(), bool(success)
+
     def close(self):
         self.env.close()
         del self.env
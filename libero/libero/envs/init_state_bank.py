@@ -0,0 +1,165 @@
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+from robosuite.utils.errors import RandomizationError
+
+from libero.libero import libero_config_path
+
+# The init states of each task are generated offline by scripts/build_init_state_bank.py
+# and stored as one .npy per bddl file, named after the hash of its content so that
+# editing the task invalidates its bank
+INIT_STATE_BANK_DIR = os.environ.get(
+    "LIBERO_INIT_STATE_BANK_DIR", os.path.join(libero_config_path, "init_state_bank")
+)
+
+
+def get_init_state_bank_file(bddl_file_name, bank_dir=INIT_STATE_BANK_DIR):
+    with open(bddl_file_name, "rb") as f:
+        bddl_hash = hashlib.sha1(f.read()).hexdigest()[:16]
+    task_name = os.path.splitext(os.path.basename(bddl_file_name))[0]
+    return os.path.join(bank_dir, f"{task_name}-{bddl_hash}.npy")
+
+
+def get_object_positions(env):
+    """
+    Returns the (num_objects, 3) positions of the movable objects of a ControlEnv.
+    """
+    domain = env.env
+    return np.array(
+        [
+            domain.sim.data.body_xpos[domain.obj_body_id[object_name]]
+            for object_name in domain.objects_dict
+        ]
+    ).reshape(-1, 3)
+
+
+def settle_init_state(env, init_state, num_settle_steps=5):
+    """
+    Sets an init state and steps the env with zero actions, as the evaluation does
+    before running the policy.
+
+    Returns:
+        np.array: the settled sim state
+        float: the largest displacement of a movable object while settling
+    """
+    env.set_init_state(init_state)
+    object_pos = get_object_positions(env)
+    for _ in range(num_settle_steps):
+        env.step(np.zeros(env.env.action_dim))
+    displacement = np.linalg.norm(get_object_positions(env) - object_pos, axis=-1)
+    return env.get_sim_state(), float(displacement.max(initial=0.0))
+
+
+def sample_init_state(env, max_placement_failures):
+    """
+    Resets a ControlEnv to object placements sampled live and returns its init state.
+    Unlike ControlEnv.reset, this gives up after max_placement_failures failed
+    placements instead of retrying forever on a task whose objects can not be placed.
+
+    Returns:
+        np.array: the sampled init state, None if all the placements failed
+        int: the number of failed placements
+    """
+    for placement_failures in range(max_placement_failures):
+        try:
+            env.env.reset()
+        except RandomizationError:
+            continue
+        return env.get_sim_state(), placement_failures
+    return None, max_placement_failures
+
+
+def generate_init_states(
+    env,
+    num_init_states,
+    num_settle_steps=5,
+    max_displacement=0.01,
+    max_tries=None,
+    max_placement_failures=None,
+):
+    """
+    Samples init states from the placement samplers of a ControlEnv without an init
+    state bank, and keeps the ones where no object moves by more than
+    max_displacement while settling.
+
+    Args:
+        env (ControlEnv): the env of the task, sampling its init states live
+        num_init_states (int): the number of stable init states to generate
+        num_settle_steps (int): the number of zero action steps the states are settled for
+        max_displacement (float): the largest displacement of a stable state in meters
+        max_tries (int): the number of states sampled at most, 10 * num_init_states by default
+        max_placement_failures (int): the number of failed placements after which the
+            sampling stops, 10 * num_init_states by default
+
+    Returns:
+        np.array: the (n, state_dim) stable init states, n <= num_init_states
+        int: the number of failed placements, max_placement_failures if the task failed
+    """
+    assert env.init_state_bank is None, "[error] the env must sample its states live"
+    if max_tries is None:
+        max_tries = 10 * num_init_states
+    if max_placement_failures is None:
+        max_placement_failures = 10 * num_init_states
+    init_states = []
+    placement_failures = 0
+    for _ in range(max_tries):
+        if len(init_states) == num_init_states:
+            break
+        init_state, failures = sample_init_state(
+            env, max_placement_failures - placement_failures
+        )
+        placement_failures += failures
+        if init_state is None:
+            break
+        _, displacement = settle_init_state(env, init_state, num_settle_steps)
+        if displacement <= max_displacement:
+            init_states.append(init_state)
+    return np.array(init_states), placement_failures
+
+
+def save_init_state_bank(bddl_file_name, init_states, bank_dir=INIT_STATE_BANK_DIR):
+    bank_file = get_init_state_bank_file(bddl_file_name, bank_dir)
+    os.makedirs(bank_dir, exist_ok=True)
+    # envs created while the bank is written never read a partial file
+    fd, tmp_file = tempfile.mkstemp(dir=bank_dir, suffix=".npy.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.asarray(init_states, dtype=np.float64))
+        os.replace(tmp_file, bank_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return bank_file
+
+
+class InitStateBank:
+    """
+    The pre-validated init states of a task, which ControlEnv.reset draws from instead
+    of sampling the object placements.
+
+    Args:
+        init_states (np.array): the (num_init_states, state_dim) init states
+    """
+
+    def __init__(self, init_states):
+        assert len(init_states) > 0, "[error] the init state bank is empty"
+        self.init_states = init_states
+
+    @classmethod
+    def load(cls, bddl_file_name, bank_dir=INIT_STATE_BANK_DIR):
+        """Returns the bank of a bddl file, or None if it has not been generated."""
+        bank_file = get_init_state_bank_file(bddl_file_name, bank_dir)
+        if not os.path.exists(bank_file):
+            return None
+        init_states = np.load(bank_file, mmap_mode="r")
+        if len(init_states) == 0:
+            return None
+        return cls(init_states)
+
+    def __len__(self):
+        return len(self.init_states)
+
+    def sample(self):
+        return np.array(self.init_states[np.random.randint(len(self.init_states))])
@@ -0,0 +1,69 @@
+import hashlib
+import os
+import re
+import tempfile
+
+import mujoco
+
+from libero.libero import libero_config_path
+
+# Compiled models are stored as mujoco binaries named after the hash of the MJCF they were compiled from
+MODEL_CACHE_DIR = os.environ.get(
+    "LIBERO_MODEL_CACHE_DIR", os.path.join(libero_config_path, "model_cache")
+)
+
+
+def get_model_cache_key(xml):
+    """
+    Hashes the MJCF together with everything else the compiled model depends on: the
+    version of mujoco, and the size and modification time of every asset file it
+    references (meshes, textures, ...), so that editing an asset invalidates the entry.
+
+    Args:
+        xml (str): the MJCF of the scene
+
+    Returns:
+        str: the hex digest identifying the compiled model
+    """
+    h = hashlib.sha256()
+    h.update(mujoco.__version__.encode())
+    h.update(xml.encode())
+    for asset_file in sorted(set(re.findall(r'file="([^"]+)"', xml))):
+        if os.path.exists(asset_file):
+            asset_stat = os.stat(asset_file)
+            h.update(f"{asset_file}:{asset_stat.st_size}:{asset_stat.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+
+def load_compiled_model(xml, cache_dir=MODEL_CACHE_DIR):
+    """
+    Returns the compiled mujoco model of the MJCF, loading it from the cache if the same
+    scene has been compiled before, and compiling and storing it otherwise.
+
+    Args:
+        xml (str): the MJCF of the scene
+        cache_dir (str): the directory of the cached binaries
+
+    Returns:
+        mujoco.MjModel: the compiled model
+    """
+    model_file = os.path.join(cache_dir, f"{get_model_cache_key(xml)}.mjb")
+    if os.path.exists(model_file):
+        try:
+            return mujoco.MjModel.from_binary_path(model_file)
+        except ValueError:
+            # e.g. a file truncated by a full disk, compile it again below
+            pass
+
+    model = mujoco.MjModel.from_xml_string(xml)
+    os.makedirs(cache_dir, exist_ok=True)
+    # write to a temporary file first so that envs created in parallel never read a partial binary
+    fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".mjb.tmp")
+    os.close(fd)
+    try:
+        mujoco.mj_saveModel(model, tmp_file, None)
+        os.replace(tmp_file, model_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return model
@@ -133,11 +133,7 @@ class Libero_Floor_Manipulation(BDDLBaseDomain):
         """
         Check if the goal is achieved. Consider conjunction goals at the moment
         """
-        goal_state = self.parsed_problem["goal_state"]
-        result = True
-        for state in goal_state:
-            result = self._eval_predicate(state) and result
-        return result
+        return self._check_goal_state()
 
     def _eval_predicate(self, state):
         if len(state) == 3:
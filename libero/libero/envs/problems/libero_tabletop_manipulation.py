@@ -138,15 +138,7 @@ class Libero_Tabletop_Manipulation(BDDLBaseDomain):
         """
         Check if the goal is achieved. Consider conjunction goals at the moment
         """
-        goal_state = self.parsed_problem["goal_state"]
-        # print(f"Goal state to evaluate: {goal_state}")
-        result = True
-        for state in goal_state:
-            predicate_result = self._eval_predicate(state)
-            # print(f"Evaluating predicate {state}: {predicate_result}")
-            result = predicate_result and result
-        # print(f"Final success result: {result}")
-        return result
+        return self._check_goal_state()
 
 
     def _eval_predicate(self, state):
@@ -10,6 +10,74 @@ from robosuite.utils.placement_samplers import ObjectPositionSampler
 from robosuite.utils.transform_utils import quat_multiply
 import robosuite.utils.transform_utils as T
 
+# Candidate positions of an object are drawn and checked for overlaps in batches of
+# PLACEMENT_BATCH_SIZE, and placing the object fails after MAX_PLACEMENT_TRIES candidates
+PLACEMENT_BATCH_SIZE = 500
+MAX_PLACEMENT_TRIES = 5000
+
+
+def sample_valid_xy(
+    x_ranges,
+    y_ranges,
+    boundary_radius,
+    offset,
+    object_z,
+    horizontal_radius,
+    bottom_offset,
+    placed_objects,
+    ensure_valid_placement=True,
+):
+    """
+    Samples the (x, y) position of an object, uniformly in a randomly chosen one of the regions,
+    that does not overlap any of the placed objects. The candidates are drawn in batches and
+    all of them are checked against all the placed objects at once.
+    Args:
+        x_ranges (list of 2-tuple): the (min, max) x range of each region
+        y_ranges (list of 2-tuple): the (min, max) y range of each region
+        boundary_radius (float): margin kept between the sampled position and the region boundaries
+        offset (2-array): (x, y) offset added to the sampled positions
+        object_z (float): the z position of the object
+        horizontal_radius (float): horizontal radius of the object
+        bottom_offset (3-array): bottom offset of the object
+        placed_objects (dict): object names mapped to their (pos, quat, MujocoObject) placement
+        ensure_valid_placement (bool): If False, the first candidate is returned
+    Returns:
+        None or 2-tuple: the sampled (x, y) position, or None if no candidate was valid
+    """
+    x_ranges = np.asarray(x_ranges, dtype=np.float64)
+    y_ranges = np.asarray(y_ranges, dtype=np.float64)
+    x_low, x_high = x_ranges[:, 0] + boundary_radius, x_ranges[:, 1] - boundary_radius
+    y_low, y_high = y_ranges[:, 0] + boundary_radius, y_ranges[:, 1] - boundary_radius
+
+    # The height test does not depend on the candidate, so only the placed objects
+    # the new object could collide with are kept, as (x, y, minimum distance)
+    obstacles = np.array(
+        [
+            (x, y, other_obj.horizontal_radius + horizontal_radius)
+            for (x, y, z), _, other_obj in placed_objects.values()
+            if object_z - z <= other_obj.top_offset[-1] - bottom_offset[-1]
+        ]
+        if ensure_valid_placement
+        else [],
+        dtype=np.float64,
+    ).reshape(-1, 3)
+
+    for _ in range(MAX_PLACEMENT_TRIES // PLACEMENT_BATCH_SIZE):
+        idx = np.random.randint(len(x_ranges), size=PLACEMENT_BATCH_SIZE)
+        object_x = np.random.uniform(low=x_low[idx], high=x_high[idx]) + offset[0]
+        object_y = np.random.uniform(low=y_low[idx], high=y_high[idx]) + offset[1]
+        # objects cannot overlap
+        valid = ~np.any(
+            (object_x[:, None] - obstacles[:, 0]) ** 2
+            + (object_y[:, None] - obstacles[:, 1]) ** 2
+            <= obstacles[:, 2] ** 2,
+            axis=1,
+        )
+        valid_ids = np.flatnonzero(valid)
+        if len(valid_ids) > 0:
+            return object_x[valid_ids[0]], object_y[valid_ids[0]]
+    return None
+
 
 class MultiRegionRandomSampler(ObjectPositionSampler):
     """
@@ -54,7 +122,6 @@ class MultiRegionRandomSampler(ObjectPositionSampler):
         self.num_ranges = len(self.x_ranges)
         self.rotation = rotation
         self.rotation_axis = rotation_axis
-        self.idx = 0
 
         super().__init__(
             name=name,
@@ -65,34 +132,6 @@ class MultiRegionRandomSampler(ObjectPositionSampler):
             z_offset=z_offset,
         )
 
-    def _sample_x(self, object_horizontal_radius):
-        """
-        Samples the x location for a given object
-        Args:
-            object_horizontal_radius (float): Radius of the object currently being sampled for
-        Returns:
-            float: sampled x position
-        """
-        minimum, maximum = self.x_ranges[self.idx]
-        if self.ensure_object_boundary_in_range:
-            minimum += object_horizontal_radius
-            maximum -= object_horizontal_radius
-        return np.random.uniform(high=maximum, low=minimum)
-
-    def _sample_y(self, object_horizontal_radius):
-        """
-        Samples the y location for a given object
-        Args:
-            object_horizontal_radius (float): Radius of the object currently being sampled for
-        Returns:
-            float: sampled y position
-        """
-        minimum, maximum = self.y_ranges[self.idx]
-        if self.ensure_object_boundary_in_range:
-            minimum += object_horizontal_radius
-            maximum -= object_horizontal_radius
-        return np.random.uniform(high=maximum, low=minimum)
-
     def _sample_quat(self):
         """
         Samples the orientation for a given object
@@ -175,45 +214,34 @@ class MultiRegionRandomSampler(ObjectPositionSampler):
 
             horizontal_radius = obj.horizontal_radius
             bottom_offset = obj.bottom_offset
-            success = False
-            for i in range(5000):  # 5000 retries
-                self.idx = np.random.randint(self.num_ranges)
-                object_x = self._sample_x(horizontal_radius) + base_offset[0]
-                object_y = self._sample_y(horizontal_radius) + base_offset[1]
-                object_z = self.z_offset + base_offset[2]
-                if on_top:
-                    object_z -= bottom_offset[-1]
-
-                # objects cannot overlap
-                location_valid = True
-                if self.ensure_valid_placement:
-                    for (x, y, z), _, other_obj in placed_objects.values():
-                        if (
-                            np.linalg.norm((object_x - x, object_y - y))
-                            <= other_obj.horizontal_radius + horizontal_radius
-                        ) and (
-                            object_z - z <= other_obj.top_offset[-1] - bottom_offset[-1]
-                        ):
-                            location_valid = False
-                            break
-
-                if location_valid:
-                    # random rotation
-                    quat = self._sample_quat()
-
-                    # multiply this quat by the object's initial rotation if it has the attribute specified
-                    if hasattr(obj, "init_quat"):
-                        quat = quat_multiply(quat, obj.init_quat)
-
-                    # location is valid, put the object down
-                    pos = (object_x, object_y, object_z)
-                    placed_objects[obj.name] = (pos, quat, obj)
-                    success = True
-                    break
-
-            if not success:
+            object_z = self.z_offset + base_offset[2]
+            if on_top:
+                object_z -= bottom_offset[-1]
+            object_xy = sample_valid_xy(
+                self.x_ranges,
+                self.y_ranges,
+                horizontal_radius if self.ensure_object_boundary_in_range else 0,
+                base_offset[:2],
+                object_z,
+                horizontal_radius,
+                bottom_offset,
+                placed_objects,
+                ensure_valid_placement=self.ensure_valid_placement,
+            )
+            if object_xy is None:
                 raise RandomizationError("Cannot place all objects ):")
 
+            # random rotation
+            quat = self._sample_quat()
+
+            # multiply this quat by the object's initial rotation if it has the attribute specified
+            if hasattr(obj, "init_quat"):
+                quat = quat_multiply(quat, obj.init_quat)
+
+            # location is valid, put the object down
+            pos = (*object_xy, object_z)
+            placed_objects[obj.name] = (pos, quat, obj)
+
         return placed_objects
 
 
@@ -261,7 +289,6 @@ class SiteRegionRandomSampler(ObjectPositionSampler):
         self.num_ranges = len(self.x_ranges)
         self.rotation = rotation
         self.rotation_axis = rotation_axis
-        self.idx = 0
         self.sim = sim
         super().__init__(
             name=name,
@@ -272,34 +299,6 @@ class SiteRegionRandomSampler(ObjectPositionSampler):
             z_offset=z_offset,
         )
 
-    def _sample_x(self, object_horizontal_radius):
-        """
-        Samples the x location for a given object
-        Args:
-            object_horizontal_radius (float): Radius of the object currently being sampled for
-        Returns:
-            float: sampled x position
-        """
-        minimum, maximum = self.x_ranges[self.idx]
-        if self.ensure_object_boundary_in_range:
-            minimum += object_horizontal_radius
-            maximum -= object_horizontal_radius
-        return np.random.uniform(high=maximum, low=minimum)
-
-    def _sample_y(self, object_horizontal_radius):
-        """
-        Samples the y location for a given object
-        Args:
-            object_horizontal_radius (float): Radius of the object currently being sampled for
-        Returns:
-            float: sampled y position
-        """
-        minimum, maximum = self.y_ranges[self.idx]
-        if self.ensure_object_boundary_in_range:
-            minimum += object_horizontal_radius
-            maximum -= object_horizontal_radius
-        return np.random.uniform(high=maximum, low=minimum)
-
     def _sample_quat(self):
         """
         Samples the orientation for a given object
@@ -412,47 +411,36 @@ class SiteRegionRandomSampler(ObjectPositionSampler):
 
             horizontal_radius = obj.horizontal_radius
             bottom_offset = obj.bottom_offset
-            success = False
             site_x, site_y, site_z = T.quat2mat(
                 T.convert_quat(ref_quat, to="xyzw")
             ) @ sim.data.get_site_xpos(site_name)
-            for i in range(5000):  # 5000 retries
-                self.idx = np.random.randint(self.num_ranges)
-                object_x = self._sample_x(horizontal_radius) + base_offset[0] + site_x
-                object_y = self._sample_y(horizontal_radius) + base_offset[1] + site_y
-                object_z = self.z_offset + base_offset[2] + site_z
-                if on_top:
-                    object_z -= bottom_offset[-1]
-
-                # objects cannot overlap
-                location_valid = True
-                if self.ensure_valid_placement:
-                    for (x, y, z), _, other_obj in placed_objects.values():
-                        if (
-                            np.linalg.norm((object_x - x, object_y - y))
-                            <= other_obj.horizontal_radius + horizontal_radius
-                        ) and (
-                            object_z - z <= other_obj.top_offset[-1] - bottom_offset[-1]
-                        ):
-                            location_valid = False
-                            break
-
-                if location_valid:
-                    # random rotation
-                    quat = self._sample_quat()
-                    # multiply this quat by the object's initial rotation if it has the attribute specified
-                    if hasattr(obj, "init_quat"):
-                        quat = quat_multiply(quat, obj.init_quat)
-
-                    # location is valid, put the object down
-                    pos = (object_x, object_y, object_z)
-                    placed_objects[obj.name] = (pos, quat, obj)
-                    success = True
-                    break
-
-            if not success:
+            object_z = self.z_offset + base_offset[2] + site_z
+            if on_top:
+                object_z -= bottom_offset[-1]
+            object_xy = sample_valid_xy(
+                self.x_ranges,
+                self.y_ranges,
+                horizontal_radius if self.ensure_object_boundary_in_range else 0,
+                (base_offset[0] + site_x, base_offset[1] + site_y),
+                object_z,
+                horizontal_radius,
+                bottom_offset,
+                placed_objects,
+                ensure_valid_placement=self.ensure_valid_placement,
+            )
+            if object_xy is None:
                 raise RandomizationError("Cannot place all objects ):")
 
+            # random rotation
+            quat = self._sample_quat()
+            # multiply this quat by the object's initial rotation if it has the attribute specified
+            if hasattr(obj, "init_quat"):
+                quat = quat_multiply(quat, obj.init_quat)
+
+            # location is valid, put the object down
+            pos = (*object_xy, object_z)
+            placed_objects[obj.name] = (pos, quat, obj)
+
         return placed_objects
 
 
@@ -619,51 +607,38 @@ class InSiteRegionRandomSampler(SiteRegionRandomSampler):
 
             horizontal_radius = obj.horizontal_radius
             bottom_offset = obj.bottom_offset
-            success = False
             site_x, site_y, site_z = T.quat2mat(
                 T.convert_quat(ref_quat, to="xyzw")
             ) @ sim.data.get_site_xpos(site_name)
-            for i in range(5000):  # 5000 retries
-                self.idx = np.random.randint(self.num_ranges)
-                object_x = self._sample_x(0) + base_offset[0] + site_x
-                object_y = self._sample_y(0) + base_offset[1] + site_y
-                object_z = self.z_offset + base_offset[2] + site_z
-                if on_top:
-                    object_z -= bottom_offset[-1]
-
-                # objects cannot overlap
-                location_valid = True
-                if self.ensure_valid_placement:
-                    for (x, y, z), _, other_obj in placed_objects.values():
-                        if (
-                            np.linalg.norm((object_x - x, object_y - y))
-                            <= other_obj.horizontal_radius + horizontal_radius
-                        ) and (
-                            object_z - z <= other_obj.top_offset[-1] - bottom_offset[-1]
-                        ):
-                            location_valid = False
-                            break
-
-                if location_valid:
-                    # random rotation
-                    quat = self._sample_quat()
-
-                    # multiply this quat by the object's initial rotation if it has the attribute specified
-                    if hasattr(obj, "init_quat"):
-                        quat = quat_multiply(quat, obj.init_quat)
-
-                    # location is valid, put the object down
-                    pos = (object_x, object_y, object_z)
-                    placed_objects[obj.name] = (pos, quat, obj)
-                    success = True
-                    break
-
-            if not success:
-                import pdb
-
-                pdb.set_trace()
+            object_z = self.z_offset + base_offset[2] + site_z
+            if on_top:
+                object_z -= bottom_offset[-1]
+            # the object center only has to be inside the site
+            object_xy = sample_valid_xy(
+                self.x_ranges,
+                self.y_ranges,
+                0,
+                (base_offset[0] + site_x, base_offset[1] + site_y),
+                object_z,
+                horizontal_radius,
+                bottom_offset,
+                placed_objects,
+                ensure_valid_placement=self.ensure_valid_placement,
+            )
+            if object_xy is None:
                 raise RandomizationError("Cannot place all objects ):")
 
+            # random rotation
+            quat = self._sample_quat()
+
+            # multiply this quat by the object's initial rotation if it has the attribute specified
+            if hasattr(obj, "init_quat"):
+                quat = quat_multiply(quat, obj.init_quat)
+
+            # location is valid, put the object down
+            pos = (*object_xy, object_z)
+            placed_objects[obj.name] = (pos, quat, obj)
+
         return placed_objects
 
 
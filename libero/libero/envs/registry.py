@@ -0,0 +1,70 @@
+import importlib
+
+from libero.libero.envs.registry_index import OBJECT_INDEX, PROBLEM_INDEX
+
+
+class LazyRegistry(dict):
+    """
+    A registry of classes filled by their register decorators, which knows from an index
+    which module registers each key and only imports that module when the key is first
+    looked up, so that importing the registry does not import robosuite and every object
+    and problem. Iterating over the registry imports all the indexed modules, while names()
+    lists the keys without importing anything.
+
+    The index is generated by scripts/build_registry_index.py and has to be rebuilt when
+    classes are added or renamed. Classes registered by modules missing from the index
+    are still found once their module has been imported.
+    """
+
+    def __init__(self, index):
+        super().__init__()
+        self.index = index
+
+    def __missing__(self, key):
+        if key in self.index:
+            importlib.import_module(self.index[key])
+            if self.is_loaded(key):
+                return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return self.is_loaded(key) or key in self.index
+
+    def __iter__(self):
+        self.load_all()
+        return super().__iter__()
+
+    def __len__(self):
+        self.load_all()
+        return super().__len__()
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        self.load_all()
+        return super().keys()
+
+    def values(self):
+        self.load_all()
+        return super().values()
+
+    def items(self):
+        self.load_all()
+        return super().items()
+
+    def is_loaded(self, key):
+        return dict.__contains__(self, key)
+
+    def names(self):
+        return sorted(set(self.index) | set(dict.keys(self)))
+
+    def load_all(self):
+        for module in sorted(set(self.index.values())):
+            importlib.import_module(module)
+
+
+TASK_MAPPING = LazyRegistry(PROBLEM_INDEX)
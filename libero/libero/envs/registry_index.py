@@ -0,0 +1,64 @@
+# Generated by scripts/build_registry_index.py, do not edit.
+# Maps each registered object category and problem name to the module registering it.
+
+OBJECT_INDEX = {
+    "akita_black_bowl": "libero.libero.envs.objects.google_scanned_objects",
+    "alphabet_soup": "libero.libero.envs.objects.hope_objects",
+    "basin_faucet": "libero.libero.envs.objects.articulated_objects",
+    "basket": "libero.libero.envs.objects.google_scanned_objects",
+    "bbq_sauce": "libero.libero.envs.objects.hope_objects",
+    "black_book": "libero.libero.envs.objects.turbosquid_objects",
+    "bowl_drainer": "libero.libero.envs.objects.turbosquid_objects",
+    "butter": "libero.libero.envs.objects.hope_objects",
+    "chefmate_8_frypan": "libero.libero.envs.objects.google_scanned_objects",
+    "cherries": "libero.libero.envs.objects.hope_objects",
+    "chocolate_pudding": "libero.libero.envs.objects.hope_objects",
+    "cookies": "libero.libero.envs.objects.hope_objects",
+    "corn": "libero.libero.envs.objects.hope_objects",
+    "cream_cheese": "libero.libero.envs.objects.hope_objects",
+    "desk_caddy": "libero.libero.envs.objects.turbosquid_objects",
+    "dining_set_group": "libero.libero.envs.objects.turbosquid_objects",
+    "faucet": "libero.libero.envs.objects.articulated_objects",
+    "flat_stove": "libero.libero.envs.objects.articulated_objects",
+    "glazed_rim_porcelain_ramekin": "libero.libero.envs.objects.google_scanned_objects",
+    "ketchup": "libero.libero.envs.objects.hope_objects",
+    "macaroni_and_cheese": "libero.libero.envs.objects.hope_objects",
+    "mayo": "libero.libero.envs.objects.hope_objects",
+    "microwave": "libero.libero.envs.objects.articulated_objects",
+    "milk": "libero.libero.envs.objects.hope_objects",
+    "moka_pot": "libero.libero.envs.objects.turbosquid_objects",
+    "new_salad_dressing": "libero.libero.envs.objects.hope_objects",
+    "orange_juice": "libero.libero.envs.objects.hope_objects",
+    "plate": "libero.libero.envs.objects.google_scanned_objects",
+    "popcorn": "libero.libero.envs.objects.hope_objects",
+    "porcelain_mug": "libero.libero.envs.objects.turbosquid_objects",
+    "rack": "libero.libero.envs.objects.google_scanned_objects",
+    "red_coffee_mug": "libero.libero.envs.objects.turbosquid_objects",
+    "salad_dressing": "libero.libero.envs.objects.hope_objects",
+    "short_cabinet": "libero.libero.envs.objects.articulated_objects",
+    "short_fridge": "libero.libero.envs.objects.articulated_objects",
+    "slide_cabinet": "libero.libero.envs.objects.articulated_objects",
+    "target_zone": "libero.libero.envs.objects.target_zones",
+    "tomato_sauce": "libero.libero.envs.objects.hope_objects",
+    "white_bowl": "libero.libero.envs.objects.google_scanned_objects",
+    "white_cabinet": "libero.libero.envs.objects.articulated_objects",
+    "white_storage_box": "libero.libero.envs.objects.turbosquid_objects",
+    "white_yellow_mug": "libero.libero.envs.objects.turbosquid_objects",
+    "window": "libero.libero.envs.objects.articulated_objects",
+    "wine_bottle": "libero.libero.envs.objects.turbosquid_objects",
+    "wine_rack": "libero.libero.envs.objects.turbosquid_objects",
+    "wooden_cabinet": "libero.libero.envs.objects.articulated_objects",
+    "wooden_shelf": "libero.libero.envs.objects.turbosquid_objects",
+    "wooden_tray": "libero.libero.envs.objects.turbosquid_objects",
+    "wooden_two_layer_shelf": "libero.libero.envs.objects.turbosquid_objects",
+    "yellow_book": "libero.libero.envs.objects.turbosquid_objects",
+}
+
+PROBLEM_INDEX = {
+    "libero_coffee_table_manipulation": "libero.libero.envs.problems.libero_coffee_table_manipulation",
+    "libero_floor_manipulation": "libero.libero.envs.problems.libero_floor_manipulation",
+    "libero_kitchen_tabletop_manipulation": "libero.libero.envs.problems.libero_kitchen_tabletop_manipulation",
+    "libero_living_room_tabletop_manipulation": "libero.libero.envs.problems.libero_living_room_tabletop_manipulation",
+    "libero_study_tabletop_manipulation": "libero.libero.envs.problems.libero_study_tabletop_manipulation",
+    "libero_tabletop_manipulation": "libero.libero.envs.problems.libero_tabletop_manipulation",
+}
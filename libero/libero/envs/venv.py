@@ -8,9 +8,9 @@ import time
 
 from abc import ABC, abstractmethod
 from collections import OrderedDict
-from multiprocessing import Array, Pipe, connection
+from multiprocessing import Array, Pipe, connection, shared_memory
 from multiprocessing.context import Process
-from typing import Any, Callable, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import multiprocessing
 
@@ -19,6 +19,11 @@ if multiprocessing.get_start_method(allow_none=True) != "spawn":
     multiprocessing.set_start_method("spawn", force=True)
 
 
+# Modules imported once by the fork server, before it forks the workers of the
+# SubprocVectorEnvs created with start_method="forkserver": robosuite, mujoco and
+# all the registered objects and problems
+FORKSERVER_PRELOAD_MODULES = ["libero.libero.envs"]
+
 gym_old_venv_step_type = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
 gym_new_venv_step_type = Tuple[
     np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray
@@ -203,6 +208,38 @@ class ShArray:
         return np.frombuffer(obj, dtype=self.dtype).reshape(self.shape)  # type: ignore
 
 
+class ShStackedArray:
+    """Shared memory array holding one observation key of all the envs of a
+    vector env, stacked along the first axis. It is pickled by the name of its
+    shared memory block, so that it can be sent to running workers."""
+
+    def __init__(
+        self, dtype: np.dtype, shape: Tuple[int], name: Optional[str] = None
+    ) -> None:
+        self.dtype = np.dtype(dtype)
+        self.shape = tuple(shape)
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(
+            name=name,
+            create=self.owner,
+            size=max(int(np.prod(self.shape)) * self.dtype.itemsize, 1),
+        )
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    def __getstate__(self) -> Tuple[str, Tuple[int], str]:
+        return self.dtype.str, self.shape, self.shm.name
+
+    def __setstate__(self, state: Tuple[str, Tuple[int], str]) -> None:
+        dtype, shape, name = state
+        self.__init__(dtype, shape, name=name)
+
+    def close(self) -> None:
+        del self.array
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
 def _setup_buf(space: gym.Space) -> Union[dict, tuple, ShArray]:
     if isinstance(space, gym.spaces.Dict):
         assert isinstance(space.spaces, OrderedDict)
@@ -233,6 +270,29 @@ def _worker(
                 _encode_obs(obs[k], buffer[k])
         return None
 
+    # the shared buffers of the stacked observation keys and of the step results
+    # between the observation and the info, and the row of this worker in them
+    stacked_bufs: Optional[dict] = None
+    step_result_bufs: Optional[list] = None
+    stacked_index: Optional[int] = None
+    # the env state the next fork_rollout commands start from, sent once per worker
+    fork_state: Optional[dict] = None
+
+    def _encode_stacked_obs(obs: Any) -> Any:
+        if stacked_bufs is None:
+            return obs
+        for key, buf in stacked_bufs.items():
+            buf.array[stacked_index] = obs[key]
+        return None
+
+    def _encode_step_return(env_return: tuple) -> tuple:
+        obs = _encode_stacked_obs(env_return[0])
+        if step_result_bufs is None:
+            return (obs, *env_return[1:])
+        for buf, value in zip(step_result_bufs, env_return[1:-1]):
+            buf.array[stacked_index] = value
+        return (obs, *[None] * len(step_result_bufs), env_return[-1])
+
     parent.close()
     env = env_fn_wrapper.data()
     try:
@@ -247,6 +307,8 @@ def _worker(
                 if obs_bufs is not None:
                     _encode_obs(env_return[0], obs_bufs)
                     env_return = (None, *env_return[1:])
+                else:
+                    env_return = _encode_step_return(env_return)
                 p.send(env_return)
             elif cmd == "reset":
                 retval = env.reset(**data)
@@ -262,6 +324,7 @@ def _worker(
                 if obs_bufs is not None:
                     _encode_obs(obs, obs_bufs)
                     obs = None
+                obs = _encode_stacked_obs(obs)
                 if reset_returns_info:
                     p.send((obs, info))
                 else:
@@ -269,6 +332,11 @@ def _worker(
             elif cmd == "close":
                 p.send(env.close())
                 p.close()
+                for buf in [
+                    *(stacked_bufs or {}).values(),
+                    *(step_result_bufs or []),
+                ]:
+                    buf.close()
                 break
             elif cmd == "render":
                 p.send(env.render(**data) if hasattr(env, "render") else None)
@@ -290,7 +358,34 @@ def _worker(
                 p.send(env.get_sim_state())
             elif cmd == "set_init_state":
                 obs = env.set_init_state(data)
-                p.send(obs)
+                p.send(_encode_stacked_obs(obs))
+            elif cmd == "set_init_state_and_step":
+                # e.g. the warm-up steps of an evaluation episode in one round trip
+                init_state, actions = data
+                obs = env.set_init_state(init_state)
+                for action in actions:
+                    obs = env.step(action)[0]
+                p.send(_encode_stacked_obs(obs))
+            elif cmd == "restore_sim_state":
+                env.restore_sim_state(data)
+                p.send(env.check_success())
+            elif cmd == "get_env_state":
+                p.send(env.get_env_state())
+            elif cmd == "set_fork_state":
+                fork_state = data
+            elif cmd == "fork_rollout":
+                env.set_env_state(fork_state)
+                p.send(env.rollout(data))
+            elif cmd == "set_env_fn":
+                env.close()
+                env = data.data()
+                p.send(None)
+            elif cmd == "set_stacked_obs_bufs":
+                stacked_bufs, stacked_index = data
+                p.send(None)
+            elif cmd == "set_step_result_bufs":
+                step_result_bufs, stacked_index = data
+                p.send(None)
             else:
                 p.close()
                 raise NotImplementedError
@@ -303,6 +398,8 @@ class DummyEnvWorker(EnvWorker):
 
     def __init__(self, env_fn: Callable[[], gym.Env]) -> None:
         self.env = env_fn()
+        # the env state the next fork_rollout calls start from
+        self._fork_state: Optional[dict] = None
         super().__init__(env_fn)
 
     def get_env_attr(self, key: str) -> Any:
@@ -352,15 +449,40 @@ class DummyEnvWorker(EnvWorker):
     def get_sim_state(self):
         return self.env.get_sim_state()
 
-    def set_init_state(self, init_state):
-        return self.env.set_init_state(init_state)
+    def set_init_state(self, init_state, warmup_actions=None):
+        obs = self.env.set_init_state(init_state)
+        for action in warmup_actions if warmup_actions is not None else []:
+            obs = self.env.step(action)[0]
+        return obs
+
+    def restore_sim_state(self, mujoco_state):
+        self.env.restore_sim_state(mujoco_state)
+        return self.env.check_success()
+
+    def get_env_state(self):
+        return self.env.get_env_state()
+
+    def set_fork_state(self, env_state):
+        self._fork_state = env_state
+
+    def fork_rollout(self, actions):
+        self.env.set_env_state(self._fork_state)
+        return self.env.rollout(actions)
+
+    def set_env_fn(self, env_fn):
+        self.env.close()
+        self._env_fn = env_fn
+        self.env = env_fn()
 
 
 class SubprocEnvWorker(EnvWorker):
     """Subprocess worker used in SubprocVectorEnv and ShmemVectorEnv."""
 
     def __init__(
-        self, env_fn: Callable[[], gym.Env], share_memory: bool = False
+        self,
+        env_fn: Callable[[], gym.Env],
+        share_memory: bool = False,
+        context: Optional[multiprocessing.context.BaseContext] = None,
     ) -> None:
         self.parent_remote, self.child_remote = Pipe()
         self.share_memory = share_memory
@@ -377,7 +499,8 @@ class SubprocEnvWorker(EnvWorker):
             CloudpickleWrapper(env_fn),
             self.buffer,
         )
-        self.process = Process(target=_worker, args=args, daemon=True)
+        process_class = context.Process if context is not None else Process
+        self.process = process_class(target=_worker, args=args, daemon=True)
         self.process.start()
         self.child_remote.close()
         super().__init__(env_fn)
@@ -507,13 +630,38 @@ class SubprocEnvWorker(EnvWorker):
         self.parent_remote.send(["get_sim_state", None])
         return self.parent_remote.recv()
 
-    def set_init_state(self, init_state):
-        self.parent_remote.send(["set_init_state", init_state])
+    def set_init_state(self, init_state, warmup_actions=None):
+        if warmup_actions is None:
+            self.parent_remote.send(["set_init_state", init_state])
+        else:
+            self.parent_remote.send(
+                ["set_init_state_and_step", (init_state, warmup_actions)]
+            )
         obs = self.parent_remote.recv()
         if self.share_memory:
             obs = self._decode_obs()
         return obs
 
+    def restore_sim_state(self, mujoco_state):
+        self.parent_remote.send(["restore_sim_state", mujoco_state])
+        return self.parent_remote.recv()
+
+    def get_env_state(self):
+        self.parent_remote.send(["get_env_state", None])
+        return self.parent_remote.recv()
+
+    def set_fork_state(self, env_state):
+        self.parent_remote.send(["set_fork_state", env_state])
+
+    def fork_rollout(self, actions):
+        self.parent_remote.send(["fork_rollout", actions])
+        return self.parent_remote.recv()
+
+    def set_env_fn(self, env_fn):
+        self._env_fn = env_fn
+        self.parent_remote.send(["set_env_fn", CloudpickleWrapper(env_fn)])
+        return self.parent_remote.recv()
+
 
 ################################################################################
 #
@@ -579,6 +727,7 @@ class BaseVectorEnv(object):
         worker_fn: Callable[[Callable[[], gym.Env]], EnvWorker],
         wait_num: Optional[int] = None,
         timeout: Optional[float] = None,
+        stacked_obs_keys: Optional[List[str]] = None,
     ) -> None:
         self._env_fns = env_fns
         # A VectorEnv contains a pool of EnvWorkers, which corresponds to
@@ -598,6 +747,12 @@ class BaseVectorEnv(object):
             self.timeout is None or self.timeout > 0
         ), f"timeout is {timeout}, it should be positive if provided!"
         self.is_async = self.wait_num != len(env_fns) or timeout is not None
+        self.stacked_obs_keys = (
+            list(stacked_obs_keys) if stacked_obs_keys is not None else None
+        )
+        assert (
+            self.stacked_obs_keys is None or not self.is_async
+        ), "stacked_obs_keys is not supported in asynchronous simulation"
         self.waiting_conn: List[EnvWorker] = []
         # environments in self.ready_id is actually ready
         # but environments in self.waiting_id are just waiting when checked,
@@ -684,6 +839,30 @@ class BaseVectorEnv(object):
             return list(range(self.env_num))
         return [id] if np.isscalar(id) else id  # type: ignore
 
+    def _stack_obs(
+        self, obs_list: List[Any], id: Union[List[int], np.ndarray]
+    ) -> Union[np.ndarray, dict]:
+        """Batch the observations of the envs in id. With stacked_obs_keys, the
+        observations are returned as a dict mapping each of these keys to the
+        array of its values stacked along the first axis, and the other keys
+        are dropped."""
+        if self.stacked_obs_keys is not None:
+            return {
+                key: np.stack([obs[key] for obs in obs_list])
+                for key in self.stacked_obs_keys
+            }
+        try:
+            return np.stack(obs_list)
+        except ValueError:  # different len(obs)
+            return np.array(obs_list, dtype=object)
+
+    def _stack_step_results(
+        self, result_lists: List[Any], id: Union[List[int], np.ndarray]
+    ) -> List[np.ndarray]:
+        """Batch the step results after the observations, e.g. (rew, done, info),
+        of the envs in id."""
+        return [np.stack(results) for results in result_lists]
+
     def _assert_id(self, id: Union[List[int], np.ndarray]) -> None:
         for i in id:
             assert (
@@ -729,10 +908,7 @@ class BaseVectorEnv(object):
                 "Tuple observation space is not supported. ",
                 "Please change it to array or dict space",
             )
-        try:
-            obs = np.stack(obs_list)
-        except ValueError:  # different len(obs)
-            obs = np.array(obs_list, dtype=object)
+        obs = self._stack_obs(obs_list, id)
 
         if reset_returns_info:
             infos = [r[1] for r in ret_list]
@@ -800,6 +976,7 @@ class BaseVectorEnv(object):
                 env_return = self.workers[j].recv()
                 env_return[-1]["env_id"] = j
                 result.append(env_return)
+            result_id = id
         else:
             if action is not None:
                 self._assert_id(id)
@@ -825,13 +1002,10 @@ class BaseVectorEnv(object):
                 env_return[-1]["env_id"] = env_id  # Add `env_id` to info
                 result.append(env_return)
                 self.ready_id.append(env_id)
+            result_id = [env_return[-1]["env_id"] for env_return in result]
         return_lists = tuple(zip(*result))
-        obs_list = return_lists[0]
-        try:
-            obs_stack = np.stack(obs_list)
-        except ValueError:  # different len(obs)
-            obs_stack = np.array(obs_list, dtype=object)
-        other_stacks = map(np.stack, return_lists[1:])
+        obs_stack = self._stack_obs(list(return_lists[0]), result_id)
+        other_stacks = self._stack_step_results(list(return_lists[1:]), result_id)
         return (obs_stack, *other_stacks)  # type: ignore
 
     def seed(
@@ -906,40 +1080,215 @@ class DummyVectorEnv(BaseVectorEnv):
         self,
         init_state: Optional[Union[int, List[int], np.ndarray]] = None,
         id: Optional[Union[int, List[int], np.ndarray]] = None,
+        warmup_actions: Optional[np.ndarray] = None,
         **kwargs: Any,
     ) -> Union[np.ndarray, Tuple[np.ndarray, Union[dict, List[dict]]]]:
         """Reset the state of some envs and return initial observations.
         If id is None, reset the state of all the environments and return
         initial observations, otherwise reset the specific environments with
-        the given id, either an int or a list.
+        the given id, either an int or a list. If warmup_actions is given, each
+        env then steps through its warmup_actions[j], a (num_steps, action_dim)
+        array, and the observations after the last step are returned.
         """
         self._assert_is_not_closed()
         id = self._wrap_id(id)
         if self.is_async:
             self._assert_id(id)
 
-        # send(None) == reset() in worker
         obs_list = []
         for j, i in enumerate(id):
-            obs = self.workers[i].set_init_state(init_state[j])
+            obs = self.workers[i].set_init_state(
+                init_state[j],
+                warmup_actions[j] if warmup_actions is not None else None,
+            )
             obs_list.append(obs)
-        obs = np.stack(obs_list)
-        return obs
+        return self._stack_obs(obs_list, id)
+
+    def restore_sim_state(
+        self,
+        mujoco_state: Union[List[np.ndarray], np.ndarray],
+        id: Optional[Union[int, List[int], np.ndarray]] = None,
+    ) -> List[bool]:
+        """Restore the flattened mujoco states of some envs without rendering any
+        observation, and return whether each restored state is a success. If id
+        is None, restore all the environments.
+        """
+        self._assert_is_not_closed()
+        id = self._wrap_id(id)
+        if self.is_async:
+            self._assert_id(id)
+
+        return [
+            self.workers[i].restore_sim_state(mujoco_state[j]) for j, i in enumerate(id)
+        ]
+
+    def get_env_state(
+        self, id: Optional[Union[int, List[int], np.ndarray]] = None
+    ) -> List[dict]:
+        """Return the states of some envs with the internals of their controllers,
+        which fork_rollouts can continue from. If id is None, return the states of
+        all the environments."""
+        self._assert_is_not_closed()
+        id = self._wrap_id(id)
+        if self.is_async:
+            self._assert_id(id)
+
+        return [self.workers[i].get_env_state() for i in id]
+
+    def fork_rollouts(
+        self,
+        env_state: dict,
+        actions: np.ndarray,
+        id: Optional[Union[int, List[int], np.ndarray]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Roll out many futures of one env state, e.g. returned by get_env_state, on
+        the envs in id, which must be of the same task. Each env is set to env_state
+        and steps through the next (num_steps, action_dim) actions[k] until it ends
+        or the task is succeeded, without computing any observation.
+
+        :return: the (num_rollouts, state_dim) final flattened mujoco states and
+            the (num_rollouts,) success flags, in the order of actions.
+        """
+        self._assert_is_not_closed()
+        assert len(actions) > 0, "[error] fork_rollouts needs at least one rollout"
+        id = self._wrap_id(id)
+        if self.is_async:
+            self._assert_id(id)
+
+        for i in id[: len(actions)]:
+            self.workers[i].set_fork_state(env_state)
+        results = [
+            self.workers[id[k % len(id)]].fork_rollout(actions[k])
+            for k in range(len(actions))
+        ]
+        final_states, successes = zip(*results)
+        return np.stack(final_states), np.array(successes)
+
+    def set_env_fn(
+        self,
+        env_fn: Callable[[], gym.Env],
+        id: Optional[Union[int, List[int], np.ndarray]] = None,
+    ) -> None:
+        """Close the envs of some workers and create new ones with env_fn in
+        their place, e.g. to evaluate another task with the same workers. If id
+        is None, replace all the environments.
+        """
+        self._assert_is_not_closed()
+        id = self._wrap_id(id)
+        if self.is_async:
+            self._assert_id(id)
+
+        for i in id:
+            self.workers[i].set_env_fn(env_fn)
+            self._env_fns[i] = env_fn
 
 
 class SubprocVectorEnv(BaseVectorEnv):
     """Vectorized environment wrapper based on subprocess.
 
+    With start_method="forkserver", the workers are forked from a fork server
+    that imported preload_modules (FORKSERVER_PRELOAD_MODULES by default) once,
+    instead of being spawned from scratch and importing robosuite, mujoco and
+    all the objects and problems each. The fork server is started with the
+    first such vector env and kept for the rest of the process, so its preload
+    modules can not be changed afterwards.
+
     .. seealso::
 
         Please refer to :class:`~tianshou.env.BaseVectorEnv` for other APIs' usage.
     """
 
-    def __init__(self, env_fns: List[Callable[[], gym.Env]], **kwargs: Any) -> None:
+    def __init__(
+        self,
+        env_fns: List[Callable[[], gym.Env]],
+        start_method: Optional[str] = None,
+        preload_modules: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> None:
+        context = None
+        if start_method is not None:
+            context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            context.set_forkserver_preload(
+                preload_modules
+                if preload_modules is not None
+                else FORKSERVER_PRELOAD_MODULES
+            )
+
         def worker_fn(fn: Callable[[], gym.Env]) -> SubprocEnvWorker:
-            return SubprocEnvWorker(fn, share_memory=False)
+            return SubprocEnvWorker(fn, share_memory=False, context=context)
 
         super().__init__(env_fns, worker_fn, **kwargs)
+        self._stacked_obs_bufs: Optional[dict] = None
+        self._step_result_bufs: Optional[list] = None
+
+    def _stack_obs(
+        self, obs_list: List[Any], id: Union[List[int], np.ndarray]
+    ) -> Union[np.ndarray, dict]:
+        """With stacked_obs_keys, the workers write these observation keys into
+        one shared memory array per key, instead of sending their observations
+        through their pipes, and the rows of the envs in id are gathered with one
+        copy per key. The arrays are allocated once the first observations are
+        received, and their shapes must stay the same when set_env_fn is used."""
+        if self.stacked_obs_keys is None:
+            return super()._stack_obs(obs_list, id)
+        if self._stacked_obs_bufs is None:
+            self._stacked_obs_bufs = {
+                key: ShStackedArray(
+                    np.asarray(obs_list[0][key]).dtype,
+                    (self.env_num, *np.shape(obs_list[0][key])),
+                )
+                for key in self.stacked_obs_keys
+            }
+            for i, w in enumerate(self.workers):
+                w.parent_remote.send(
+                    ["set_stacked_obs_bufs", (self._stacked_obs_bufs, i)]
+                )
+            for w in self.workers:
+                w.parent_remote.recv()
+            return super()._stack_obs(obs_list, id)
+        return {
+            key: buf.array[np.asarray(id)]
+            for key, buf in self._stacked_obs_bufs.items()
+        }
+
+    def _stack_step_results(
+        self, result_lists: List[Any], id: Union[List[int], np.ndarray]
+    ) -> List[np.ndarray]:
+        """With stacked_obs_keys, the step results between the observation and
+        the info (rew and done, or rew, terminated and truncated) are also
+        written by the workers into shared memory arrays, allocated after the
+        first step, and only the info is still sent through the pipes."""
+        if self.stacked_obs_keys is None:
+            return super()._stack_step_results(result_lists, id)
+        if self._step_result_bufs is None:
+            self._step_result_bufs = [
+                ShStackedArray(
+                    np.asarray(results[0]).dtype,
+                    (self.env_num, *np.shape(results[0])),
+                )
+                for results in result_lists[:-1]
+            ]
+            for i, w in enumerate(self.workers):
+                w.parent_remote.send(
+                    ["set_step_result_bufs", (self._step_result_bufs, i)]
+                )
+            for w in self.workers:
+                w.parent_remote.recv()
+            return super()._stack_step_results(result_lists, id)
+        return [buf.array[np.asarray(id)] for buf in self._step_result_bufs] + [
+            np.stack(result_lists[-1])
+        ]
+
+    def close(self) -> None:
+        super().close()
+        for buf in [
+            *(self._stacked_obs_bufs or {}).values(),
+            *(self._step_result_bufs or []),
+        ]:
+            buf.close()
+        self._stacked_obs_bufs = None
+        self._step_result_bufs = None
 
     def check_success(self):
         return [w.check_success() for w in self.workers]
@@ -957,22 +1306,128 @@ class SubprocVectorEnv(BaseVectorEnv):
         self,
         init_state: Optional[Union[int, List[int], np.ndarray]] = None,
         id: Optional[Union[int, List[int], np.ndarray]] = None,
+        warmup_actions: Optional[np.ndarray] = None,
         **kwargs: Any,
     ) -> Union[np.ndarray, Tuple[np.ndarray, Union[dict, List[dict]]]]:
         """Reset the state of some envs and return initial observations.
         If id is None, reset the state of all the environments and return
         initial observations, otherwise reset the specific environments with
-        the given id, either an int or a list.
+        the given id, either an int or a list. If warmup_actions is given, each
+        env then steps through its warmup_actions[j], a (num_steps, action_dim)
+        array, and the observations after the last step are returned.
         """
         self._assert_is_not_closed()
         id = self._wrap_id(id)
         if self.is_async:
             self._assert_id(id)
 
-        # send(None) == reset() in worker
-        obs_list = []
+        # send to all the workers first so that they set their states in parallel
         for j, i in enumerate(id):
-            obs = self.workers[i].set_init_state(init_state[j])
-            obs_list.append(obs)
-        obs = np.stack(obs_list)
-        return obs
+            if warmup_actions is None:
+                self.workers[i].parent_remote.send(["set_init_state", init_state[j]])
+            else:
+                self.workers[i].parent_remote.send(
+                    ["set_init_state_and_step", (init_state[j], warmup_actions[j])]
+                )
+        obs_list = [self.workers[i].parent_remote.recv() for i in id]
+        return self._stack_obs(obs_list, id)
+
+    def restore_sim_state(
+        self,
+        mujoco_state: Union[List[np.ndarray], np.ndarray],
+        id: Optional[Union[int, List[int], np.ndarray]] = None,
+    ) -> List[bool]:
+        """Restore the flattened mujoco states of some envs without rendering any
+        observation, and return whether each restored state is a success. If id
+        is None, restore all the environments.
+        """
+        self._assert_is_not_closed()
+        id = self._wrap_id(id)
+        if self.is_async:
+            self._assert_id(id)
+
+        # send to all the workers first so that they restore their states in parallel
+        for j, i in enumerate(id):
+            self.workers[i].parent_remote.send(["restore_sim_state", mujoco_state[j]])
+        return [self.workers[i].parent_remote.recv() for i in id]
+
+    def get_env_state(
+        self, id: Optional[Union[int, List[int], np.ndarray]] = None
+    ) -> List[dict]:
+        """Return the states of some envs with the internals of their controllers,
+        which fork_rollouts can continue from. If id is None, return the states of
+        all the environments."""
+        self._assert_is_not_closed()
+        id = self._wrap_id(id)
+        if self.is_async:
+            self._assert_id(id)
+
+        for i in id:
+            self.workers[i].parent_remote.send(["get_env_state", None])
+        return [self.workers[i].parent_remote.recv() for i in id]
+
+    def fork_rollouts(
+        self,
+        env_state: dict,
+        actions: np.ndarray,
+        id: Optional[Union[int, List[int], np.ndarray]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Roll out many futures of one env state, e.g. returned by get_env_state, on
+        the envs in id, which must be of the same task. Each env is set to env_state
+        and steps through the next (num_steps, action_dim) actions[k] until it ends
+        or the task is succeeded, without computing any observation. There can be
+        more rollouts than envs, each env starts the next remaining rollout as soon
+        as it is done with its last one.
+
+        :return: the (num_rollouts, state_dim) final flattened mujoco states and
+            the (num_rollouts,) success flags, in the order of actions.
+        """
+        self._assert_is_not_closed()
+        assert len(actions) > 0, "[error] fork_rollouts needs at least one rollout"
+        id = self._wrap_id(id)
+        if self.is_async:
+            self._assert_id(id)
+
+        num_rollouts = len(actions)
+        # the state is sent once to each worker, the rollouts only send their actions
+        for i in id[:num_rollouts]:
+            self.workers[i].set_fork_state(env_state)
+        results: List[Any] = [None] * num_rollouts
+        # the rollout each busy worker is running
+        running: Dict[SubprocEnvWorker, int] = {}
+        next_rollout = 0
+        while next_rollout < num_rollouts or len(running) > 0:
+            for i in id:
+                worker = self.workers[i]
+                if next_rollout < num_rollouts and worker not in running:
+                    worker.parent_remote.send(["fork_rollout", actions[next_rollout]])
+                    running[worker] = next_rollout
+                    next_rollout += 1
+            for worker in SubprocEnvWorker.wait(list(running), 1):
+                results[running.pop(worker)] = worker.parent_remote.recv()
+        final_states, successes = zip(*results)
+        return np.stack(final_states), np.array(successes)
+
+    def set_env_fn(
+        self,
+        env_fn: Callable[[], gym.Env],
+        id: Optional[Union[int, List[int], np.ndarray]] = None,
+    ) -> None:
+        """Close the envs of some workers and create new ones with env_fn in
+        their place, e.g. to evaluate another task with the same workers. If id
+        is None, replace all the environments.
+        """
+        self._assert_is_not_closed()
+        id = self._wrap_id(id)
+        if self.is_async:
+            self._assert_id(id)
+
+        # send to all the workers first so that they create their envs in parallel
+        for i in id:
+            self.workers[i]._env_fn = env_fn
+            self.workers[i].parent_remote.send(
+                ["set_env_fn", CloudpickleWrapper(env_fn)]
+            )
+        for i in id:
+            self.workers[i].parent_remote.recv()
+            self._env_fns[i] = env_fn
@@ -197,7 +197,7 @@ class Sequential(nn.Module, metaclass=AlgoMeta):
                 sim_states = (
                     result_summary[task_str] if self.cfg.eval.save_sim_states else None
                 )
-                success_rate = evaluate_one_task_success(
+                success_rate, num_episodes = evaluate_one_task_success(
                     cfg=self.cfg,
                     algo=self,
                     task=task,
@@ -205,6 +205,8 @@ class Sequential(nn.Module, metaclass=AlgoMeta):
                     task_id=task_id,
                     sim_states=sim_states,
                     task_str="",
+                    best_success_rate=prev_success_rate,
+                    return_num_episodes=True,
                 )
                 successes.append(success_rate)
 
@@ -216,7 +218,7 @@ class Sequential(nn.Module, metaclass=AlgoMeta):
                 t1 = time.time()
 
                 cumulated_counter += 1.0
-                ci = confidence_interval(success_rate, self.cfg.eval.n_eval)
+                ci = confidence_interval(success_rate, num_episodes)
                 tmp_successes = np.array(successes)
                 tmp_successes[idx_at_best_succ:] = successes[idx_at_best_succ]
                 print(
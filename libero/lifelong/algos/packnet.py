@@ -213,7 +213,7 @@ class PackNet(Sequential):
                     task_emb = benchmark.get_task_emb(task_id)
                     task_str = f"k{task_id}_e{epoch//self.cfg.lifelong.post_eval_every}"
 
-                    success_rate = evaluate_one_task_success(
+                    success_rate, num_episodes = evaluate_one_task_success(
                         self.cfg,
                         self,
                         task,
@@ -221,6 +221,8 @@ class PackNet(Sequential):
                         task_id,
                         sim_states=sim_states,
                         task_str="",
+                        best_success_rate=prev_success_rate,
+                        return_num_episodes=True,
                     )
 
                     if prev_success_rate < success_rate:
@@ -235,7 +237,7 @@ class PackNet(Sequential):
 
                     t1 = time.time()
 
-                    ci = confidence_interval(success_rate, self.cfg.eval.n_eval)
+                    ci = confidence_interval(success_rate, num_episodes)
                     print(
                         f"[info] Epoch: {epoch:3d} | succ: {success_rate:4.2f} ± {ci:4.2f}"
                         + f"best succ: {prev_success_rate} "
@@ -21,6 +21,7 @@ from pathlib import Path
 
 from libero.libero import get_libero_path
 from libero.libero.benchmark import get_benchmark
+from libero.libero.benchmark.init_states_store import load_init_states
 from libero.libero.envs import OffScreenRenderEnv, SubprocVectorEnv
 from libero.libero.utils.time_utils import Timer
 from libero.libero.utils.video_utils import VideoWriter
@@ -238,6 +239,7 @@ def main():
             ),
             "camera_heights": cfg.data.img_h,
             "camera_widths": cfg.data.img_w,
+            "use_model_cache": cfg.eval.get("use_model_cache", False),
         }
 
         env_num = 20
@@ -248,10 +250,9 @@ def main():
         env.seed(cfg.seed)
         algo.reset()
 
-        init_states_path = os.path.join(
+        init_states = load_init_states(
             cfg.init_states_folder, task.problem_folder, task.init_states_file
         )
-        init_states = torch.load(init_states_path)
         indices = np.arange(env_num) % init_states.shape[0]
         init_states_ = init_states[indices]
 
@@ -22,7 +22,7 @@ from libero.libero.benchmark import get_benchmark
 from libero.lifelong.algos import get_algo_class, get_algo_list
 from libero.lifelong.models import get_policy_list
 from libero.lifelong.datasets import GroupedTaskDataset, SequenceVLDataset, get_dataset
-from libero.lifelong.metric import evaluate_loss, evaluate_success
+from libero.lifelong.metric import close_eval_env_pool, evaluate_loss, evaluate_success
 from libero.lifelong.utils import (
     NpEncoder,
     compute_flops,
@@ -260,6 +260,7 @@ def main(hydra_cfg):
                     result_summary, os.path.join(cfg.experiment_dir, f"result.pt")
                 )
 
+    close_eval_env_pool()
     print("[info] finished learning\n")
     if cfg.use_wandb:
         wandb.finish()
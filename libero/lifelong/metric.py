@@ -1,5 +1,6 @@
 import copy
 import gc
+from collections import OrderedDict
 import numpy as np
 import os
 import robomimic.utils.obs_utils as ObsUtils
@@ -10,6 +11,7 @@ import torch.multiprocessing as mp
 import torch.nn.functional as F
 from torch.utils.data import DataLoader
 
+from libero.libero.benchmark.init_states_store import load_init_states
 from libero.libero.envs import OffScreenRenderEnv, SubprocVectorEnv, DummyVectorEnv
 from libero.libero.utils.time_utils import Timer
 from libero.libero.utils.video_utils import VideoWriter
@@ -19,44 +21,494 @@ from libero.lifelong.utils import *
 def raw_obs_to_tensor_obs(obs, task_emb, cfg):
     """
     Prepare the tensor observations as input for the algorithm.
+    obs:      one observation dict per env, or a dict mapping each observation
+              key to the observations of all the envs stacked along the first
+              axis, as returned by the vector envs with stacked_obs_keys
+    task_emb: the task embedding shared by all the observations, or one task
+              embedding per observation stacked into a (env_num, E) tensor
     """
-    env_num = len(obs)
+    if isinstance(obs, dict):
+        env_num = len(next(iter(obs.values())))
+    else:
+        env_num = len(obs)
 
     data = {
         "obs": {},
-        "task_emb": task_emb.repeat(env_num, 1),
+        "task_emb": task_emb.repeat(env_num, 1) if task_emb.dim() == 1 else task_emb,
     }
 
-    all_obs_keys = []
+    # each key is converted for the whole batch at once, on the device, so that
+    # e.g. images are moved as uint8 and normalized and transposed in one op
     for modality_name, modality_list in cfg.data.obs.modality.items():
         for obs_name in modality_list:
-            data["obs"][obs_name] = []
-        all_obs_keys += modality_list
-
-    for k in range(env_num):
-        for obs_name in all_obs_keys:
-            data["obs"][obs_name].append(
-                ObsUtils.process_obs(
-                    torch.from_numpy(obs[k][cfg.data.obs_key_mapping[obs_name]]),
-                    obs_key=obs_name,
-                ).float()
-            )
-
-    for key in data["obs"]:
-        data["obs"][key] = torch.stack(data["obs"][key])
+            obs_key = cfg.data.obs_key_mapping[obs_name]
+            if isinstance(obs, dict):
+                batch = obs[obs_key]
+            else:
+                batch = np.stack([obs[k][obs_key] for k in range(env_num)])
+            data["obs"][obs_name] = ObsUtils.process_obs(
+                safe_device(torch.from_numpy(batch), device=cfg.device),
+                obs_key=obs_name,
+            ).float()
 
     data = TensorUtils.map_tensor(data, lambda x: safe_device(x, device=cfg.device))
     return data
 
 
+def split_obs(obs):
+    """
+    Split the observations returned by the vector envs into one observation
+    per env. Observations stacked per key are split into views of their rows.
+    """
+    if isinstance(obs, dict):
+        env_num = len(next(iter(obs.values())))
+        return [{key: value[j] for key, value in obs.items()} for j in range(env_num)]
+    return list(obs)
+
+
+def get_policy_obs_keys(cfg):
+    """
+    The environment observation keys the policy consumes.
+    """
+    return [
+        cfg.data.obs_key_mapping[obs_name]
+        for modality_list in cfg.data.obs.modality.values()
+        for obs_name in modality_list
+    ]
+
+
+def get_eval_env_args(cfg, task):
+    """
+    The arguments of the evaluation envs of a task.
+    """
+    env_args = {
+        "bddl_file_name": os.path.join(
+            cfg.bddl_folder, task.problem_folder, task.bddl_file
+        ),
+        "camera_heights": cfg.data.img_h,
+        "camera_widths": cfg.data.img_w,
+        "use_model_cache": cfg.eval.get("use_model_cache", False),
+    }
+    if cfg.eval.get("policy_obs_only", False):
+        env_args["obs_keys"] = tuple(get_policy_obs_keys(cfg))
+    if cfg.eval.get("init_state_bank", None) is not None:
+        # the episodes still start from the fixed init states, the bank only makes
+        # the reset before setting them skip the placement sampling
+        env_args["init_state_bank"] = cfg.eval.init_state_bank
+        env_args["init_state_bank_fallback"] = cfg.eval.get(
+            "init_state_bank_fallback", True
+        )
+    return env_args
+
+
+def create_eval_env(env_args_list, start_method=None):
+    """
+    Create the vectorized evaluation envs, one per element of env_args_list,
+    retrying a few times since the offscreen renderer can fail to get a frame
+    buffer. If the envs only compute the declared "obs_keys", the vector env
+    returns these keys stacked per key, through shared memory for subprocesses.
+    start_method: how the subprocesses are started, e.g. "forkserver" to fork
+                  them from a server that imported the simulation stack once
+    """
+    stacked_obs_keys = env_args_list[0].get("obs_keys")
+    env_fns = [
+        lambda env_args=env_args: OffScreenRenderEnv(**env_args)
+        for env_args in env_args_list
+    ]
+    # Try to handle the frame buffer issue
+    env_creation = False
+
+    count = 0
+    while not env_creation and count < 5:
+        try:
+            if len(env_fns) == 1:
+                env = DummyVectorEnv(env_fns, stacked_obs_keys=stacked_obs_keys)
+            else:
+                env = SubprocVectorEnv(
+                    env_fns,
+                    start_method=start_method,
+                    stacked_obs_keys=stacked_obs_keys,
+                )
+            env_creation = True
+        except:
+            time.sleep(5)
+            count += 1
+    if count >= 5:
+        raise Exception("Failed to create environment")
+    # the env args each worker was created with, updated by set_eval_env_args
+    env.worker_env_args = list(env_args_list)
+    return env
+
+
+def set_eval_env_args(env, env_args, id):
+    """
+    Recreate the envs of the workers in id with env_args, e.g. to switch them
+    to another task, in parallel for subprocess workers.
+    """
+    env.set_env_fn(lambda env_args=env_args: OffScreenRenderEnv(**env_args), id=id)
+    for k in id:
+        env.worker_env_args[k] = env_args
+
+
+class EvalEnvPool:
+    """
+    Keeps the vectorized evaluation envs alive between evaluations, both of one
+    task and of a whole suite, so that the workers are started once per run
+    instead of at every evaluation. Envs are keyed by their number of workers
+    and their arguments apart from the bddl file, the workers being switched
+    between tasks with set_env_fn, and the least recently used ones are closed
+    once more than max_envs are alive.
+    """
+
+    def __init__(self, max_envs, start_method=None):
+        self.max_envs = max_envs
+        self.start_method = start_method
+        self.envs = OrderedDict()
+
+    def get(self, env_args_list):
+        """
+        Return a vectorized env whose k-th worker hosts the env of
+        env_args_list[k]. A kept env with as many workers and the same args
+        apart from the bddl file is reused, and only its workers hosting
+        another task are switched with set_eval_env_args.
+        """
+        key = (
+            tuple(
+                sorted(
+                    (name, value)
+                    for name, value in env_args_list[0].items()
+                    if name != "bddl_file_name"
+                )
+            ),
+            len(env_args_list),
+        )
+        if key in self.envs:
+            self.envs.move_to_end(key)
+            env = self.envs[key]
+            switched_ids = OrderedDict()
+            for k, env_args in enumerate(env_args_list):
+                if env.worker_env_args[k] != env_args:
+                    args_key = tuple(sorted(env_args.items()))
+                    switched_ids.setdefault(args_key, (env_args, []))[1].append(k)
+            for env_args, ids in switched_ids.values():
+                set_eval_env_args(env, env_args, ids)
+            return env
+        # make room before spawning new workers
+        while len(self.envs) >= self.max_envs:
+            _, env = self.envs.popitem(last=False)
+            env.close()
+        env = create_eval_env(env_args_list, start_method=self.start_method)
+        self.envs[key] = env
+        return env
+
+    def close(self):
+        while len(self.envs) > 0:
+            _, env = self.envs.popitem(last=False)
+            env.close()
+
+
+_eval_env_pool = None
+
+
+def get_eval_env_pool(cfg):
+    """
+    Return the evaluation env pool of this run, or None if cfg.eval.env_pool_size
+    is 0 and the envs should be created and closed at every evaluation.
+    """
+    global _eval_env_pool
+    env_pool_size = cfg.eval.get("env_pool_size", 0)
+    if env_pool_size <= 0:
+        return None
+    if _eval_env_pool is None:
+        _eval_env_pool = EvalEnvPool(
+            env_pool_size, start_method=cfg.eval.get("worker_start_method", None)
+        )
+    return _eval_env_pool
+
+
+def close_eval_env_pool():
+    """
+    Close all the envs kept by the evaluation env pool.
+    """
+    global _eval_env_pool
+    if _eval_env_pool is not None:
+        _eval_env_pool.close()
+        _eval_env_pool = None
+
+
+class PolicyServer:
+    """
+    Serves the action requests of all the env workers of an evaluation with as
+    few policy calls as possible. Every running episode submits its latest
+    observation together with its own policy history, and flush() batches the
+    requests that share a policy and can share a history (same
+    BasePolicy.eval_history_key, e.g. the same number of past steps), runs the
+    policy once per batch of at most max_batch_size requests, and scatters the
+    actions and updated histories back to the episodes.
+    """
+
+    def __init__(self, cfg, max_batch_size=0):
+        self.cfg = cfg
+        self.max_batch_size = max_batch_size
+        self.requests = []
+
+    def submit(self, algo, obs, task_emb, history=None):
+        """
+        Queue a request and return its index in the results of the next flush.
+        history is None for the first step of an episode.
+        """
+        if history is None:
+            algo.reset()
+            history = algo.policy.get_eval_history()
+        self.requests.append((algo, obs, task_emb, history))
+        return len(self.requests) - 1
+
+    def flush(self):
+        """
+        Run the queued requests and return the (action, history) of each of them.
+        """
+        batches = OrderedDict()
+        for i, (algo, _, _, history) in enumerate(self.requests):
+            key = (id(algo), algo.policy.eval_history_key(history))
+            batches.setdefault(key, []).append(i)
+
+        results = [None] * len(self.requests)
+        for request_ids in batches.values():
+            batch_size = self.max_batch_size or len(request_ids)
+            for start in range(0, len(request_ids), batch_size):
+                batch = [self.requests[i] for i in request_ids[start : start + batch_size]]
+                policy = batch[0][0].policy
+                policy.set_eval_history(
+                    policy.cat_eval_histories([history for _, _, _, history in batch])
+                )
+                data = raw_obs_to_tensor_obs(
+                    [obs for _, obs, _, _ in batch],
+                    torch.stack([task_emb for _, _, task_emb, _ in batch]),
+                    self.cfg,
+                )
+                actions = policy.get_action(data)
+                histories = policy.split_eval_history(
+                    policy.get_eval_history(), [1] * len(batch)
+                )
+                for i, action, history in zip(
+                    request_ids[start : start + batch_size], actions, histories
+                ):
+                    results[i] = (action, history)
+        self.requests = []
+        return results
+
+
+def run_eval_episodes(cfg, env, env_num, tasks, worker_tasks=None):
+    """
+    Run the evaluation episodes of one or more tasks on the env workers and
+    return the number of successful episodes and the number of episodes used
+    for each task.
+
+    tasks:        one dict per task with its "algo", "task_emb", "init_states",
+                  "n_eval" episodes to run and, optionally, the "env_args" to
+                  create its env, a "sim_states" list where the sim states of
+                  episode i are appended to sim_states[i] and an "early_stop"
+                  function of (num_success, num_episodes) that returns True
+                  once the task's success rate is known well enough to stop
+                  running its episodes. Episode i starts from
+                  init_states[i % len(init_states)].
+    worker_tasks: the index of the task whose env each worker hosts, all
+                  workers host the first task if None. A worker whose task has
+                  no episodes left is switched to the task with the most
+                  remaining episodes by recreating its env from "env_args".
+
+    Instead of running the episodes in lockstep batches of env_num, a worker is
+    handed the next episode as soon as its episode ends, and only workers with
+    a running episode are stepped. Each episode keeps its own policy history,
+    and the actions of all the running episodes are computed together by a
+    PolicyServer.
+
+    Since failed episodes run until cfg.eval.max_steps, the episodes do not end
+    in order, and only the episodes 0..n-1 that have all ended are counted, so
+    that stopping a task early does not bias its success rate towards the
+    episodes that end first.
+    """
+    worker_tasks = list(worker_tasks) if worker_tasks is not None else [0] * env_num
+    policy_server = PolicyServer(
+        cfg, max_batch_size=cfg.eval.get("max_inference_batch_size", 0)
+    )
+    # per task: the outcome of each ended episode, and the number of episodes and
+    # successes in the longest run of ended episodes starting from episode 0
+    episode_success = [{} for _ in tasks]
+    num_episodes = [0] * len(tasks)
+    num_success = [0] * len(tasks)
+    stopped = [False] * len(tasks)
+    next_episode = [0] * len(tasks)
+    free_workers = list(range(env_num))
+    running_workers = []
+    # per worker: its latest observation, episode, number of policy steps and policy history
+    last_obs = [None] * env_num
+    worker_episode = [None] * env_num
+    worker_steps = [0] * env_num
+    worker_history = [None] * env_num
+
+    def remaining(t):
+        if stopped[t]:
+            return 0
+        return tasks[t]["n_eval"] - next_episode[t]
+
+    def end_episode(k, success):
+        t = worker_tasks[k]
+        episode_success[t][worker_episode[k]] = success
+        while num_episodes[t] in episode_success[t]:
+            num_success[t] += int(episode_success[t].pop(num_episodes[t]))
+            num_episodes[t] += 1
+        early_stop = tasks[t].get("early_stop")
+        if (
+            not stopped[t]
+            and num_episodes[t] < tasks[t]["n_eval"]
+            and early_stop is not None
+            and early_stop(num_success[t], num_episodes[t])
+        ):
+            stopped[t] = True
+
+    def record_sim_states(worker_ids):
+        worker_ids = [
+            k for k in worker_ids if tasks[worker_tasks[k]].get("sim_states") is not None
+        ]
+        if len(worker_ids) == 0:
+            return
+        sim_state = env.get_sim_state()
+        for k in worker_ids:
+            tasks[worker_tasks[k]]["sim_states"][worker_episode[k]].append(
+                sim_state[k]
+            )
+
+    while any(remaining(t) > 0 for t in range(len(tasks))) or len(running_workers) > 0:
+        # hand the next episodes to the free workers, preferring the task they
+        # already host
+        assignments = {}
+        for k in free_workers:
+            t = worker_tasks[k]
+            if remaining(t) - len(assignments.get(t, [])) <= 0:
+                t = max(
+                    range(len(tasks)),
+                    key=lambda t: remaining(t) - len(assignments.get(t, [])),
+                )
+                if remaining(t) - len(assignments.get(t, [])) <= 0:
+                    continue
+            assignments.setdefault(t, []).append(k)
+        free_workers = [
+            k for k in free_workers if not any(k in ids for ids in assignments.values())
+        ]
+
+        for t, ids in assignments.items():
+            task = tasks[t]
+            switched_ids = [k for k in ids if worker_tasks[k] != t]
+            if len(switched_ids) > 0:
+                set_eval_env_args(env, task["env_args"], switched_ids)
+                for k in switched_ids:
+                    worker_tasks[k] = t
+            episodes = np.arange(next_episode[t], next_episode[t] + len(ids))
+            next_episode[t] += len(ids)
+
+            env.reset(id=ids)
+            # dummy actions all zeros for initial physics simulation, run by the
+            # workers right after setting the init states
+            obs = env.set_init_state(
+                task["init_states"][episodes % task["init_states"].shape[0]],
+                id=ids,
+                warmup_actions=np.zeros((len(ids), 5, 7)),
+            )
+
+            for j, (k, worker_obs) in enumerate(zip(ids, split_obs(obs))):
+                last_obs[k] = worker_obs
+                worker_episode[k] = episodes[j]
+                worker_steps[k] = 0
+                worker_history[k] = None
+            running_workers += ids
+            record_sim_states(ids)
+
+        for k in running_workers:
+            task = tasks[worker_tasks[k]]
+            policy_server.submit(
+                task["algo"], last_obs[k], task["task_emb"], worker_history[k]
+            )
+        step_actions = []
+        for k, (action, history) in zip(running_workers, policy_server.flush()):
+            step_actions.append(action)
+            worker_history[k] = history
+
+        step_ids = running_workers
+        obs, reward, done, info = env.step(np.stack(step_actions), id=step_ids)
+        record_sim_states(step_ids)
+
+        running_workers = []
+        for j, (k, worker_obs) in enumerate(zip(step_ids, split_obs(obs))):
+            last_obs[k] = worker_obs
+            worker_steps[k] += 1
+            if done[j] or worker_steps[k] >= cfg.eval.max_steps:
+                end_episode(k, done[j])
+                worker_history[k] = None
+                free_workers.append(k)
+            else:
+                running_workers.append(k)
+        # the episodes still running for a stopped task would not be counted
+        for k in [k for k in running_workers if stopped[worker_tasks[k]]]:
+            running_workers.remove(k)
+            worker_history[k] = None
+            free_workers.append(k)
+
+    return num_success, num_episodes
+
+
+def get_early_stop_fn(cfg, best_success_rate=None):
+    """
+    Returns the sequential test deciding when a task's evaluation can stop, or
+    None if cfg.eval.early_stop is off.
+
+    The evaluation stops once the Wilson interval of the success rate of the
+    episodes used so far lies entirely below the reference rate, which is
+    best_success_rate, e.g. the best success rate of the model so far, or
+    cfg.eval.early_stop_threshold if best_success_rate is not given. It never
+    stops above it, since the truncated estimate of a model better than the
+    best one would be kept as the new best and could not be beaten anymore.
+    At least cfg.eval.early_stop_min_episodes episodes are always used.
+    """
+    if not cfg.eval.get("early_stop", False):
+        return None
+    if best_success_rate is not None and best_success_rate >= 0:
+        reference_rate = best_success_rate
+    else:
+        reference_rate = cfg.eval.get("early_stop_threshold", None)
+    if reference_rate is None:
+        return None
+    min_episodes = max(cfg.eval.get("early_stop_min_episodes", 10), 1)
+
+    def early_stop(num_success, num_episodes):
+        if num_episodes < min_episodes:
+            return False
+        _, high = wilson_interval(num_success / num_episodes, num_episodes)
+        return high < reference_rate
+
+    return early_stop
+
+
 def evaluate_one_task_success(
-    cfg, algo, task, task_emb, task_id, sim_states=None, task_str=""
+    cfg,
+    algo,
+    task,
+    task_emb,
+    task_id,
+    sim_states=None,
+    task_str="",
+    best_success_rate=None,
+    return_num_episodes=False,
 ):
     """
     Evaluate a single task's success rate
-    sim_states: if not None, will keep track of all simulated states during
-                evaluation, mainly for visualization and debugging purpose
-    task_str:   the key to access sim_states dictionary
+    sim_states:        if not None, will keep track of all simulated states during
+                       evaluation, mainly for visualization and debugging purpose
+    task_str:          the key to access sim_states dictionary
+    best_success_rate: with cfg.eval.early_stop, the rate the evaluation stops
+                       at once the success rate is confidently below it
+    return_num_episodes: also return the number of episodes evaluated, which
+                       is less than cfg.eval.n_eval if the evaluation stopped early
     """
     with Timer() as t:
         if cfg.lifelong.algo == "PackNet":  # need preprocess weights for PackNet
@@ -64,107 +516,122 @@ def evaluate_one_task_success(
 
         algo.eval()
         env_num = min(cfg.eval.num_procs, cfg.eval.n_eval) if cfg.eval.use_mp else 1
-        eval_loop_num = (cfg.eval.n_eval + env_num - 1) // env_num
 
         # initiate evaluation envs
-        env_args = {
-            "bddl_file_name": os.path.join(
-                cfg.bddl_folder, task.problem_folder, task.bddl_file
-            ),
-            "camera_heights": cfg.data.img_h,
-            "camera_widths": cfg.data.img_w,
-        }
-
-        env_num = min(cfg.eval.num_procs, cfg.eval.n_eval) if cfg.eval.use_mp else 1
-        eval_loop_num = (cfg.eval.n_eval + env_num - 1) // env_num
-
-        # Try to handle the frame buffer issue
-        env_creation = False
-
-        count = 0
-        while not env_creation and count < 5:
-            try:
-                if env_num == 1:
-                    env = DummyVectorEnv(
-                        [lambda: OffScreenRenderEnv(**env_args) for _ in range(env_num)]
-                    )
-                else:
-                    env = SubprocVectorEnv(
-                        [lambda: OffScreenRenderEnv(**env_args) for _ in range(env_num)]
-                    )
-                env_creation = True
-            except:
-                time.sleep(5)
-                count += 1
-        if count >= 5:
-            raise Exception("Failed to create environment")
+        env_args = get_eval_env_args(cfg, task)
+
+        env_pool = get_eval_env_pool(cfg)
+        if env_pool is not None:
+            env = env_pool.get([env_args] * env_num)
+        else:
+            env = create_eval_env(
+                [env_args] * env_num,
+                start_method=cfg.eval.get("worker_start_method", None),
+            )
 
         ### Evaluation loop
         # get fixed init states to control the experiment randomness
-        init_states_path = os.path.join(
+        init_states = load_init_states(
             cfg.init_states_folder, task.problem_folder, task.init_states_file
         )
-        init_states = torch.load(init_states_path)
-        num_success = 0
-        for i in range(eval_loop_num):
-            env.reset()
-            indices = np.arange(i * env_num, (i + 1) * env_num) % init_states.shape[0]
-            init_states_ = init_states[indices]
-
-            dones = [False] * env_num
-            steps = 0
-            algo.reset()
-            obs = env.set_init_state(init_states_)
-
-            # dummy actions [env_num, 7] all zeros for initial physics simulation
-            dummy = np.zeros((env_num, 7))
-            for _ in range(5):
-                obs, _, _, _ = env.step(dummy)
-
-            if task_str != "":
-                sim_state = env.get_sim_state()
-                for k in range(env_num):
-                    if i * env_num + k < cfg.eval.n_eval and sim_states is not None:
-                        sim_states[i * env_num + k].append(sim_state[k])
-
-            while steps < cfg.eval.max_steps:
-                steps += 1
-
-                data = raw_obs_to_tensor_obs(obs, task_emb, cfg)
-                actions = algo.policy.get_action(data)
-
-                obs, reward, done, info = env.step(actions)
-
-                # record the sim states for replay purpose
-                if task_str != "":
-                    sim_state = env.get_sim_state()
-                    for k in range(env_num):
-                        if i * env_num + k < cfg.eval.n_eval and sim_states is not None:
-                            sim_states[i * env_num + k].append(sim_state[k])
+        (num_success,), (num_episodes,) = run_eval_episodes(
+            cfg,
+            env,
+            env_num,
+            [
+                {
+                    "algo": algo,
+                    "task_emb": task_emb,
+                    "init_states": init_states,
+                    "n_eval": cfg.eval.n_eval,
+                    "sim_states": sim_states if task_str != "" else None,
+                    "early_stop": get_early_stop_fn(cfg, best_success_rate),
+                }
+            ],
+        )
 
-                # check whether succeed
-                for k in range(env_num):
-                    dones[k] = dones[k] or done[k]
+        success_rate = num_success / num_episodes
+        if env_pool is None:
+            env.close()
+        gc.collect()
+    print(
+        f"[info] evaluate task {task_id} takes {t.get_elapsed_time():.1f} seconds"
+        f" ({num_episodes}/{cfg.eval.n_eval} episodes)"
+    )
+    if return_num_episodes:
+        return success_rate, num_episodes
+    return success_rate
 
-                if all(dones):
-                    break
 
-            # a new form of success record
-            for k in range(env_num):
-                if i * env_num + k < cfg.eval.n_eval:
-                    num_success += int(dones[k])
+def evaluate_suite_success(cfg, algo, benchmark, task_ids, result_summary=None):
+    """
+    Evaluate the success rate for all task in task_ids at once, spreading the
+    episodes of all the tasks over one pool of cfg.eval.num_procs workers that
+    switch tasks as the episodes of their current task run out.
+    result_summary: if not None, keeps track of the simulated states of each
+                    task under the key f"k{task_ids[-1]}_p{task_id}"
+    """
+    with Timer() as t:
+        algo.eval()
+        tasks = []
+        for i in task_ids:
+            task = benchmark.get_task(i)
+            task_algo = algo
+            if cfg.lifelong.algo == "PackNet":  # need preprocess weights for PackNet
+                task_algo = algo.get_eval_algo(i)
+                task_algo.eval()
+            task_str = f"k{task_ids[-1]}_p{i}"
+            tasks.append(
+                {
+                    "algo": task_algo,
+                    "task_emb": benchmark.get_task_emb(i),
+                    # get fixed init states to control the experiment randomness
+                    "init_states": load_init_states(
+                        cfg.init_states_folder,
+                        task.problem_folder,
+                        task.init_states_file,
+                    ),
+                    "n_eval": cfg.eval.n_eval,
+                    "env_args": get_eval_env_args(cfg, task),
+                    "sim_states": result_summary[task_str]
+                    if result_summary is not None
+                    else None,
+                    "early_stop": get_early_stop_fn(cfg),
+                }
+            )
 
-        success_rate = num_success / cfg.eval.n_eval
-        env.close()
+        env_num = min(cfg.eval.num_procs, cfg.eval.n_eval * len(tasks))
+        # start with the workers spread evenly over the tasks
+        worker_tasks = [k * len(tasks) // env_num for k in range(env_num)]
+        env_args_list = [tasks[t]["env_args"] for t in worker_tasks]
+        env_pool = get_eval_env_pool(cfg)
+        if env_pool is not None:
+            env = env_pool.get(env_args_list)
+        else:
+            env = create_eval_env(
+                env_args_list, start_method=cfg.eval.get("worker_start_method", None)
+            )
+        num_success, num_episodes = run_eval_episodes(
+            cfg, env, env_num, tasks, worker_tasks
+        )
+        if env_pool is None:
+            env.close()
         gc.collect()
-    print(f"[info] evaluate task {task_id} takes {t.get_elapsed_time():.1f} seconds")
-    return success_rate
+    print(
+        f"[info] evaluate tasks {list(task_ids)} takes {t.get_elapsed_time():.1f} seconds"
+        f" ({sum(num_episodes)}/{cfg.eval.n_eval * len(tasks)} episodes)"
+    )
+    return np.array(num_success) / np.array(num_episodes)
 
 
 def evaluate_success(cfg, algo, benchmark, task_ids, result_summary=None):
     """
     Evaluate the success rate for all task in task_ids.
     """
+    if cfg.eval.use_mp and cfg.eval.get("suite_parallel", False):
+        return evaluate_suite_success(
+            cfg, algo, benchmark, task_ids, result_summary=result_summary
+        )
     algo.eval()
     successes = []
     for i in task_ids:
@@ -183,6 +650,8 @@ def evaluate_multitask_training_success(cfg, algo, benchmark, task_ids):
     """
     Evaluate the success rate for all task in task_ids.
     """
+    if cfg.eval.use_mp and cfg.eval.get("suite_parallel", False):
+        return evaluate_suite_success(cfg, algo, benchmark, task_ids)
     algo.eval()
     successes = []
     for i in task_ids:
@@ -123,3 +123,35 @@ class BasePolicy(nn.Module, metaclass=PolicyMeta):
         Clear all "history" of the policy if there exists any.
         """
         pass
+
+    def get_eval_history(self):
+        """
+        Return the "history" the policy has accumulated in get_action, so that the
+        evaluation can keep one history per episode.
+        """
+        return None
+
+    def set_eval_history(self, history):
+        """
+        Restore a "history" returned by get_eval_history.
+        """
+        pass
+
+    def eval_history_key(self, history):
+        """
+        Histories can only be batched together by cat_eval_histories if they
+        have the same key, e.g. the same number of past steps.
+        """
+        return None
+
+    def cat_eval_histories(self, histories):
+        """
+        Batch the histories of several episodes into one, in order.
+        """
+        return None
+
+    def split_eval_history(self, history, batch_sizes):
+        """
+        Split a batched history back into the histories of batch_sizes episodes.
+        """
+        return [None] * len(batch_sizes)
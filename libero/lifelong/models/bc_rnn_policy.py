@@ -209,3 +209,31 @@ class BCRNNPolicy(BasePolicy):
     def reset(self):
         self.eval_h0 = None
         self.eval_c0 = None
+
+    def get_eval_history(self):
+        return self.eval_h0, self.eval_c0
+
+    def set_eval_history(self, history):
+        self.eval_h0, self.eval_c0 = history
+
+    def eval_history_key(self, history):
+        return history[0] is None
+
+    def cat_eval_histories(self, histories):
+        if histories[0][0] is None:
+            return None, None
+        # the batch is the second dimension of the rnn states
+        return (
+            torch.cat([h0 for h0, _ in histories], dim=1),
+            torch.cat([c0 for _, c0 in histories], dim=1),
+        )
+
+    def split_eval_history(self, history, batch_sizes):
+        if history[0] is None:
+            return [(None, None)] * len(batch_sizes)
+        return list(
+            zip(
+                torch.split(history[0], batch_sizes, dim=1),
+                torch.split(history[1], batch_sizes, dim=1),
+            )
+        )
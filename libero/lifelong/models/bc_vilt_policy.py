@@ -231,3 +231,19 @@ class BCViLTPolicy(BasePolicy):
 
     def reset(self):
         self.latent_queue = []
+
+    def get_eval_history(self):
+        return self.latent_queue
+
+    def set_eval_history(self, history):
+        self.latent_queue = history
+
+    def eval_history_key(self, history):
+        return len(history)
+
+    def cat_eval_histories(self, histories):
+        return [torch.cat(latents, dim=0) for latents in zip(*histories)]
+
+    def split_eval_history(self, history, batch_sizes):
+        splits = [torch.split(latent, batch_sizes, dim=0) for latent in history]
+        return [[split[i] for split in splits] for i in range(len(batch_sizes))]
@@ -94,6 +94,17 @@ def confidence_interval(p, n):
     return 1.96 * np.sqrt(p * (1 - p) / n)
 
 
+def wilson_interval(p, n, z=1.96):
+    """
+    The (low, high) Wilson score interval of a success rate p over n episodes, which,
+    unlike p ± confidence_interval(p, n), does not collapse to a point when p is 0 or 1.
+    """
+    denominator = 1 + z**2 / n
+    center = (p + z**2 / (2 * n)) / denominator
+    half_width = z * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / denominator
+    return center - half_width, center + half_width
+
+
 def compute_flops(algo, dataset, cfg):
     model = copy.deepcopy(algo.policy)
     tmp_loader = DataLoader(dataset, batch_size=1, num_workers=0, shuffle=True)
@@ -0,0 +1,118 @@
+"""
+Builds the init state banks of the tasks of a benchmark, from which ControlEnv.reset draws
+its init states when created with init_state_bank=<bank dir>, instead of sampling the object
+placements and retrying until they are valid. The tasks are generated in parallel, one env
+per process, and only the states where no object moves by more than --max-displacement
+while settling for --num-settle-steps zero action steps are kept. A task whose objects fail
+to be placed more than --max-placement-failures times per init state is reported as failed
+and its bank is not written.
+
+The banks are named after the content of the bddl files, so they have to be built again
+after editing a task.
+
+Example usage:
+
+    python scripts/build_init_state_bank.py --benchmark libero_10 --num-init-states 200 --num-workers 10
+"""
+import argparse
+import multiprocessing
+import os
+import time
+
+import init_path
+from libero.libero import benchmark
+from libero.libero.envs.env_wrapper import ControlEnv
+from libero.libero.envs.init_state_bank import (
+    INIT_STATE_BANK_DIR,
+    generate_init_states,
+    get_init_state_bank_file,
+    save_init_state_bank,
+)
+
+
+def build_task_bank(bddl_file, args):
+    t0 = time.time()
+    # the states are generated without rendering, observations are not needed
+    env = ControlEnv(
+        bddl_file_name=bddl_file,
+        use_camera_obs=False,
+        has_offscreen_renderer=False,
+    )
+    env.seed(args.seed)
+    max_placement_failures = args.max_placement_failures * args.num_init_states
+    init_states, placement_failures = generate_init_states(
+        env,
+        args.num_init_states,
+        num_settle_steps=args.num_settle_steps,
+        max_displacement=args.max_displacement,
+        max_placement_failures=max_placement_failures,
+    )
+    env.close()
+    failed = placement_failures >= max_placement_failures
+    if len(init_states) > 0 and not failed:
+        save_init_state_bank(bddl_file, init_states, args.bank_dir)
+    return bddl_file, len(init_states), placement_failures, failed, time.time() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--benchmark", type=str, default="libero_10")
+    parser.add_argument("--bank-dir", type=str, default=INIT_STATE_BANK_DIR)
+    parser.add_argument("--num-init-states", type=int, default=200)
+    parser.add_argument("--num-settle-steps", type=int, default=5)
+    parser.add_argument(
+        "--max-displacement",
+        type=float,
+        default=0.01,
+        help="largest displacement of an object while settling in meters",
+    )
+    parser.add_argument(
+        "--max-placement-failures",
+        type=int,
+        default=10,
+        help="failed placements per init state after which a task is reported as failed",
+    )
+    parser.add_argument("--num-workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--overwrite", action="store_true", help="build the existing banks again"
+    )
+    args = parser.parse_args()
+
+    task_suite = benchmark.get_benchmark_dict()[args.benchmark]()
+    bddl_files = [
+        task_suite.get_task_bddl_file_path(i) for i in range(task_suite.get_num_tasks())
+    ]
+    if not args.overwrite:
+        bddl_files = [
+            bddl_file
+            for bddl_file in bddl_files
+            if not os.path.exists(get_init_state_bank_file(bddl_file, args.bank_dir))
+        ]
+    print(f"[info] building the init state banks of {len(bddl_files)} tasks")
+
+    failed_tasks = []
+    with multiprocessing.get_context("spawn").Pool(args.num_workers) as pool:
+        for result in pool.starmap(
+            build_task_bank, [(bddl_file, args) for bddl_file in bddl_files]
+        ):
+            bddl_file, num_init_states, placement_failures, failed, duration = result
+            if failed:
+                print(
+                    f"[error] {os.path.basename(bddl_file)}: {placement_failures} placement failures, the task failed"
+                )
+                failed_tasks.append(bddl_file)
+                continue
+            if num_init_states < args.num_init_states:
+                print(
+                    f"[warning] only {num_init_states} stable init states for {bddl_file}"
+                )
+            print(
+                f"[info] {os.path.basename(bddl_file)}: {num_init_states} init states in {duration:.1f} seconds"
+            )
+    if len(failed_tasks) > 0:
+        print(f"[error] {len(failed_tasks)} tasks failed: {failed_tasks}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Builds libero/libero/envs/registry_index.py, the index of the modules registering each
+object category and problem class, which lets the registries of libero.libero.envs import
+a module only when one of its classes is first requested.
+
+The modules are parsed instead of imported, so the index can be rebuilt without robosuite.
+Run it again after adding, renaming or moving an object or a problem class:
+
+    python scripts/build_registry_index.py
+"""
+import ast
+import glob
+import os
+import re
+
+ENVS_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "../libero/libero/envs")
+)
+
+
+def get_registered_classes(module_file, decorator_name):
+    with open(module_file, "r") as f:
+        tree = ast.parse(f.read())
+    return [
+        node.name
+        for node in tree.body
+        if isinstance(node, ast.ClassDef)
+        and any(
+            isinstance(decorator, ast.Name) and decorator.id == decorator_name
+            for decorator in node.decorator_list
+        )
+    ]
+
+
+def build_index(package, decorator_name, get_key):
+    index = {}
+    for module_file in sorted(glob.glob(os.path.join(ENVS_DIR, package, "*.py"))):
+        module_name = os.path.splitext(os.path.basename(module_file))[0]
+        if module_name == "__init__":
+            continue
+        for class_name in get_registered_classes(module_file, decorator_name):
+            key = get_key(class_name)
+            assert key not in index, f"[error] {key} is registered twice"
+            index[key] = f"libero.libero.envs.{package}.{module_name}"
+    return index
+
+
+def format_index(name, index):
+    lines = [f"{name} = {{"]
+    lines += [f'    "{key}": "{module}",' for key, module in sorted(index.items())]
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    # the keys are computed as in register_object and register_problem
+    object_index = build_index(
+        "objects",
+        "register_object",
+        lambda name: "_".join(re.sub(r"([A-Z0-9])", r" \1", name).split()).lower(),
+    )
+    problem_index = build_index("problems", "register_problem", str.lower)
+
+    index_file = os.path.join(ENVS_DIR, "registry_index.py")
+    with open(index_file, "w") as f:
+        f.write(
+            "# Generated by scripts/build_registry_index.py, do not edit.\n"
+            "# Maps each registered object category and problem name to the module registering it.\n\n"
+        )
+        f.write(format_index("OBJECT_INDEX", object_index))
+        f.write("\n")
+        f.write(format_index("PROBLEM_INDEX", problem_index))
+    print(
+        f"[info] indexed {len(object_index)} objects and {len(problem_index)} problems in {index_file}"
+    )
+
+
+if __name__ == "__main__":
+    main()
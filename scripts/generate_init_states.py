@@ -0,0 +1,262 @@
+"""
+Generates the fixed init states of tasks as .pruned_init files, in the format read by
+Benchmark.get_task_init_states, e.g. for new tasks created with bddl_generation_utils and
+mu_creation. For each task, --num-candidates init states are sampled from the placement
+samplers across a pool of processes, and settled for --num-settle-steps zero action steps.
+The candidates where an object moves by more than --max-displacement while settling, or
+where the goal of the task is already satisfied, are pruned, as are the candidates closer
+than --dedup-tolerance to a kept one. The first --num-init-states remaining ones are written
+to <init-states-dir>/<problem folder>/<task name>.pruned_init. A task whose objects fail to
+be placed more than --max-placement-failures times per candidate is reported as failed and
+not written. The candidates of a task are seeded from its name, so the same files are
+generated whichever other tasks are skipped.
+
+Example usage:
+
+    # the tasks of a benchmark
+    python scripts/generate_init_states.py --benchmark libero_10 --init-states-dir /tmp/init_files
+
+    # new tasks, named after their bddl files and put in the problem folder of their directory
+    python scripts/generate_init_states.py --bddl-files path/to/my_suite/*.bddl --num-workers 16
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+import init_path
+from libero.libero import benchmark, get_libero_path
+from libero.libero.envs.env_wrapper import ControlEnv
+from libero.libero.envs.init_state_bank import sample_init_state, settle_init_state
+
+# the env of the last task of each worker process, reused by its next chunks
+_worker_env = {}
+
+
+def get_worker_env(bddl_file):
+    if _worker_env.get("bddl_file") != bddl_file:
+        if "env" in _worker_env:
+            _worker_env["env"].close()
+        # the states are generated without rendering, observations are not needed
+        _worker_env["env"] = ControlEnv(
+            bddl_file_name=bddl_file,
+            use_camera_obs=False,
+            has_offscreen_renderer=False,
+        )
+        _worker_env["bddl_file"] = bddl_file
+    return _worker_env["env"]
+
+
+def sample_candidates(job):
+    """
+    Samples and settles a chunk of candidate init states of a task in a worker process.
+    """
+    task_id, bddl_file, seed, num_candidates, args = job
+    env = get_worker_env(bddl_file)
+    env.seed(seed)
+    states, displacements, goal_satisfied = [], [], []
+    placement_failures = 0
+    # a task whose objects can not be placed would otherwise keep the worker forever
+    max_placement_failures = args.max_placement_failures * num_candidates
+    while len(states) < num_candidates:
+        init_state, failures = sample_init_state(
+            env, max_placement_failures - placement_failures
+        )
+        placement_failures += failures
+        if init_state is None:
+            break
+        _, displacement = settle_init_state(env, init_state, args.num_settle_steps)
+        states.append(init_state)
+        displacements.append(displacement)
+        goal_satisfied.append(env.check_success())
+    return (
+        task_id,
+        np.array(states).reshape(len(states), -1),
+        np.array(displacements),
+        np.array(goal_satisfied, dtype=bool),
+        placement_failures,
+    )
+
+
+def deduplicate(states, tolerance):
+    """
+    Returns the indices of the states kept when dropping the ones whose largest difference
+    to an earlier kept state is below tolerance. The sim time is ignored.
+    """
+    kept = []
+    for i in range(len(states)):
+        if len(kept) == 0 or np.all(
+            np.abs(states[kept, 1:] - states[i, 1:]).max(axis=-1) >= tolerance
+        ):
+            kept.append(i)
+    return np.array(kept, dtype=int)
+
+
+def save_init_states(init_states_file, init_states):
+    import torch
+
+    init_states_dir = os.path.dirname(init_states_file)
+    os.makedirs(init_states_dir, exist_ok=True)
+    # evaluations reading the file while it is written never get a partial file
+    fd, tmp_file = tempfile.mkstemp(dir=init_states_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        torch.save(init_states, tmp_file)
+        os.replace(tmp_file, init_states_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def get_tasks(args):
+    """Returns the (bddl file, problem folder, task name) of the tasks to generate."""
+    if args.bddl_files is not None:
+        return [
+            (
+                os.path.abspath(bddl_file),
+                os.path.basename(os.path.dirname(os.path.abspath(bddl_file))),
+                os.path.splitext(os.path.basename(bddl_file))[0],
+            )
+            for bddl_file in args.bddl_files
+        ]
+    task_suite = benchmark.get_benchmark_dict()[args.benchmark]()
+    return [
+        (
+            task_suite.get_task_bddl_file_path(i),
+            task_suite.get_task(i).problem_folder,
+            task_suite.get_task(i).name,
+        )
+        for i in range(task_suite.get_num_tasks())
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    task_group = parser.add_mutually_exclusive_group(required=True)
+    task_group.add_argument("--benchmark", type=str)
+    task_group.add_argument("--bddl-files", type=str, nargs="+")
+    parser.add_argument(
+        "--init-states-dir", type=str, default=get_libero_path("init_states")
+    )
+    parser.add_argument("--num-candidates", type=int, default=2000)
+    parser.add_argument("--num-init-states", type=int, default=50)
+    parser.add_argument("--num-settle-steps", type=int, default=5)
+    parser.add_argument(
+        "--max-displacement",
+        type=float,
+        default=0.01,
+        help="largest displacement of an object while settling in meters",
+    )
+    parser.add_argument(
+        "--dedup-tolerance",
+        type=float,
+        default=1e-3,
+        help="smallest difference of a state element between two kept states",
+    )
+    parser.add_argument(
+        "--max-placement-failures",
+        type=int,
+        default=10,
+        help="failed placements per candidate after which a task is reported as failed",
+    )
+    parser.add_argument("--num-workers", type=int, default=4)
+    parser.add_argument(
+        "--chunk-size", type=int, default=100, help="candidates sampled per job"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--overwrite", action="store_true", help="generate the existing files again"
+    )
+    args = parser.parse_args()
+
+    tasks = []
+    for bddl_file, problem_folder, task_name in get_tasks(args):
+        init_states_file = os.path.join(
+            args.init_states_dir, problem_folder, f"{task_name}.pruned_init"
+        )
+        if os.path.exists(init_states_file) and not args.overwrite:
+            print(f"[info] skipping {init_states_file}, it already exists")
+            continue
+        # the seeds only depend on the task, not on which other tasks are skipped
+        task_seed = zlib.crc32(f"{problem_folder}/{task_name}".encode())
+        tasks.append((bddl_file, init_states_file, task_seed))
+
+    # every task is split into chunks of candidates with their own seed
+    jobs = []
+    for task_id, (bddl_file, _, task_seed) in enumerate(tasks):
+        for chunk_id, offset in enumerate(
+            range(0, args.num_candidates, args.chunk_size)
+        ):
+            num_candidates = min(args.chunk_size, args.num_candidates - offset)
+            seed = (task_seed + args.seed * 1000003 + chunk_id) % 2**32
+            jobs.append((task_id, bddl_file, seed, num_candidates, args))
+    remaining_chunks = [0] * len(tasks)
+    for job in jobs:
+        remaining_chunks[job[0]] += 1
+    results = [[] for _ in tasks]
+
+    print(
+        f"[info] sampling {args.num_candidates} candidates for each of {len(tasks)} tasks with {args.num_workers} workers"
+    )
+    t0 = time.time()
+    total_candidates = 0
+    failed_tasks = []
+    with multiprocessing.get_context("spawn").Pool(args.num_workers) as pool:
+        for result in pool.imap_unordered(sample_candidates, jobs):
+            task_id = result[0]
+            results[task_id].append(result[1:])
+            remaining_chunks[task_id] -= 1
+            if remaining_chunks[task_id] > 0:
+                continue
+
+            # all the chunks of the task are done
+            bddl_file, init_states_file, _ = tasks[task_id]
+            states, displacements, goal_satisfied, placement_failures = zip(
+                *results[task_id]
+            )
+            results[task_id] = None
+            num_sampled = sum(len(chunk_states) for chunk_states in states)
+            total_candidates += num_sampled
+            if num_sampled < args.num_candidates:
+                print(
+                    f"[error] {os.path.basename(bddl_file)}: only {num_sampled} candidates "
+                    f"after {sum(placement_failures)} placement failures, the task failed"
+                )
+                failed_tasks.append(bddl_file)
+                continue
+            states = np.concatenate(states)
+            stable = np.concatenate(displacements) <= args.max_displacement
+            goal_satisfied = np.concatenate(goal_satisfied)
+            valid_ids = np.flatnonzero(stable & ~goal_satisfied)
+            unique_ids = valid_ids[deduplicate(states[valid_ids], args.dedup_tolerance)]
+            init_states = states[unique_ids[: args.num_init_states]]
+
+            print(
+                f"[info] {os.path.basename(bddl_file)}: {len(states)} candidates, "
+                f"{sum(placement_failures)} placement failures, {np.sum(~stable)} unstable, "
+                f"{np.sum(stable & goal_satisfied)} satisfying the goal, "
+                f"{len(valid_ids) - len(unique_ids)} duplicates, {len(unique_ids)} kept"
+            )
+            if len(init_states) < args.num_init_states:
+                print(
+                    f"[warning] only {len(init_states)} init states for {bddl_file}, sample more candidates"
+                )
+            if len(init_states) > 0:
+                save_init_states(init_states_file, init_states)
+                print(f"[info] saved {len(init_states)} init states to {init_states_file}")
+
+    duration = time.time() - t0
+    print(
+        f"[info] {total_candidates} candidates in {duration:.1f} seconds, "
+        f"{total_candidates / max(duration, 1e-6):.1f} candidates per second"
+    )
+    if len(failed_tasks) > 0:
+        print(f"[error] {len(failed_tasks)} tasks failed: {failed_tasks}")
+
+
+if __name__ == "__main__":
+    main()